@@ -85,6 +85,29 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'to-do-app',
+    }
+}
+
+# Per-user API response cache (see to_do_app/cache.py). Responses are keyed
+# by a per-user generation kept in the database, so a per-process backend
+# such as LocMemCache stays correct with several workers; a shared backend
+# only raises the hit rate.
+TODO_RESPONSE_CACHE_ALIAS = 'default'
+TODO_RESPONSE_CACHE_TIMEOUT = 300
+# Tasks fetched (and their relations prefetched) per query by /api/tasks/export/
+TODO_EXPORT_CHUNK_SIZE = 500
+# Rows validated and written per transaction by the task import, and how many row errors it reports
+TODO_IMPORT_CHUNK_SIZE = 500
+TODO_IMPORT_MAX_ERRORS = 100
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -168,3 +191,16 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = 'your-email@gmail.com'  # Replace with your email
 EMAIL_HOST_PASSWORD = 'your-app-password'  # Replace with your app password
 DEFAULT_FROM_EMAIL = 'your-email@gmail.com'  # Replace with your email
+
+# Reminder emails sent per send_messages() call on one connection (see to_do_app/notifications.py)
+TODO_NOTIFICATION_BATCH_SIZE = 100
+# Seconds a dispatcher worker owns the reminders it claimed before others may retry them
+TODO_NOTIFICATION_LEASE_SECONDS = 300
+# Users with more dated tasks than this get their reminders rescheduled by the dispatcher
+# instead of inside the preference update request
+TODO_RESCHEDULE_INLINE_LIMIT = 1000
+# Failed reminders are retried after 2, 4, 8... minutes (with jitter) and given up after the last attempt
+TODO_NOTIFICATION_RETRY_SECONDS = 120
+TODO_NOTIFICATION_MAX_ATTEMPTS = 5
+# Default age for purge_notifications; finished reminders older than this are deleted
+TODO_NOTIFICATION_RETENTION_DAYS = 90
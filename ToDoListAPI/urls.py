@@ -9,6 +9,7 @@ from to_do_app.views import (
     TagViewSet
 )
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from to_do_app import async_views
 
 # Create a router and register our viewsets with it
 router = DefaultRouter()
@@ -18,9 +19,20 @@ router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'notification-preferences', NotificationPreferenceViewSet, basename='notification-preference')
 router.register(r'tags', TagViewSet, basename='tag')
 
+# Async versions of the read endpoints for ASGI servers
+async_urlpatterns = [
+    path('tasks/', async_views.task_list, name='async-task-list'),
+    path('tasks/upcoming_notifications/', async_views.upcoming_notifications, name='async-task-upcoming-notifications'),
+    path('tasks/<int:pk>/', async_views.task_detail, name='async-task-detail'),
+    path('tags/', async_views.tag_list, name='async-tag-list'),
+    path('tags/popular/', async_views.popular_tags, name='async-tag-popular'),
+    path('categories/', async_views.category_list, name='async-category-list'),
+]
+
 # The API URLs are now determined automatically by the router
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/async/', include(async_urlpatterns)),
     path('api/', include(router.urls)),
     path('api-auth/', include('rest_framework.urls')),  # Adds login/logout views
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -0,0 +1,34 @@
+"""Shared setup for the benchmark scripts: Django on a throwaway in-memory database"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def setup_django(database=':memory:'):
+    """
+    Configure Django on a fresh database and migrate it.
+
+    Pass a shared-cache URI such as 'file:bench?mode=memory&cache=shared'
+    when other threads (sync_to_async, the async ORM) must see the data.
+    """
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ToDoListAPI.settings')
+    import django
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = database
+    settings.ALLOWED_HOSTS = ['*']
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+def timed(label, func, repeat=3):
+    """Run func repeat times and print the best wall time"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{label:<45} {best * 1000:9.1f} ms')
+    return best
@@ -0,0 +1,62 @@
+"""
+Compare the sync read endpoints with their async versions under concurrency.
+
+    python benchmarks/bench_async_views.py [concurrency] [rounds]
+
+Requests go through Django's in-process ASGI client on a single event loop,
+which is one ASGI worker: sync views run on the one thread that
+thread-sensitive sync_to_async uses, async views on the loop itself. The
+response cache is turned off so every request does the full work.
+"""
+import asyncio
+import sys
+
+from _setup import setup_django, timed
+
+setup_django('file:bench_async?mode=memory&cache=shared')
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from to_do_app.models import Category, Tag, Task, TaskNotification
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+ROUNDS = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+ENDPOINTS = [
+    ('task list', '/api/tasks/', '/api/async/tasks/'),
+    ('popular tags', '/api/tags/popular/', '/api/async/tags/popular/'),
+    ('upcoming notifications', '/api/tasks/upcoming_notifications/', '/api/async/tasks/upcoming_notifications/'),
+]
+
+def create_data():
+    user = get_user_model().objects.create_user('bench', 'bench@example.com', 'bench')
+    category = Category.objects.create(name='Work', user=user)
+    tags = [Tag.objects.create(name=f'Tag {i}', user=user) for i in range(5)]
+    due = timezone.now() + timezone.timedelta(days=1)
+    for i in range(50):
+        task = Task.objects.create(title=f'Task {i}', user=user, category=category, due_date=due)
+        task.tags.add(*tags[:i % 5 + 1])
+        TaskNotification.objects.create(task=task, user=user, scheduled_time=due - timezone.timedelta(hours=1))
+    return user
+
+def main():
+    user = create_data()
+    client = AsyncClient()
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    async def burst(url):
+        for _ in range(ROUNDS):
+            responses = await asyncio.gather(*(client.get(url, headers=headers) for _ in range(CONCURRENCY)))
+            assert all(response.status_code == 200 for response in responses)
+
+    with override_settings(TODO_RESPONSE_CACHE_TIMEOUT=0):
+        for label, sync_url, async_url in ENDPOINTS:
+            for kind, url in [('sync', sync_url), ('async', async_url)]:
+                timed(f'{label}: {kind} ({CONCURRENCY} concurrent x {ROUNDS})', lambda: asyncio.run(burst(url)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Compare per-message reminder sending with the batched sender.
+
+    python benchmarks/bench_notifications.py [count]
+
+The baseline reproduces the previous behaviour: one send_mail() call (and
+so one backend connection) and one save() per notification.
+"""
+import contextlib
+import io
+import sys
+
+from _setup import setup_django, timed
+
+setup_django()
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail import send_mail
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from to_do_app.models import Task, TaskNotification
+from to_do_app.notifications import Reminder, build_notification_email, send_task_notifications
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+def create_notifications():
+    user = get_user_model().objects.create_user('bench', 'bench@example.com', 'bench')
+    due = timezone.now() + timezone.timedelta(hours=1)
+    tasks = Task.objects.bulk_create([
+        Task(title=f'Task {i}', user=user, due_date=due) for i in range(COUNT)
+    ])
+    TaskNotification.objects.bulk_create([
+        TaskNotification(task=task, user=user, scheduled_time=timezone.now()) for task in tasks
+    ])
+
+def reset():
+    mail.outbox = []
+    TaskNotification.objects.update(status='PENDING', sent_at=None)
+
+def send_one_by_one():
+    for notification in TaskNotification.objects.filter(
+        status='PENDING',
+        scheduled_time__lte=timezone.now()
+    ).select_related('task', 'user'):
+        task = notification.task
+        message = build_notification_email(Reminder(
+            notification.pk, task.pk, notification.user.email, task.title,
+            task.due_date, task.description, task.priority, task.completed
+        ))
+        send_mail(message.subject, message.body, message.from_email, message.to, fail_silently=False)
+        notification.status = 'SENT'
+        notification.sent_at = timezone.now()
+        notification.save()
+
+def main():
+    create_notifications()
+    backends = {
+        'locmem': 'django.core.mail.backends.locmem.EmailBackend',
+        'console': 'django.core.mail.backends.console.EmailBackend',
+    }
+    for name, backend in backends.items():
+        with override_settings(EMAIL_BACKEND=backend):
+            for label, func in [('one by one', send_one_by_one), ('batched', send_task_notifications)]:
+                def run():
+                    reset()
+                    # The console backend writes here instead of the terminal
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        func()
+                timed(f'{name}: {label} ({COUNT} reminders)', run)
+    print(f'batch size: {getattr(settings, "TODO_NOTIFICATION_BATCH_SIZE", 100)}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Compare the cost per row of TaskSerializer and TaskValuesSerializer.
+
+    python benchmarks/bench_task_serializers.py [count]
+
+Both render the same fully populated tasks (category, tags, shares and
+notifications), queries included, as one page of a task list would.
+"""
+import sys
+
+from _setup import setup_django, timed
+
+setup_django()
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from to_do_app.models import Category, Tag, Task, TaskNotification, TaskShare
+from to_do_app.serializers import TaskSerializer
+from to_do_app.values_serializers import TaskValuesSerializer
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+def create_tasks():
+    user = get_user_model().objects.create_user('bench', 'bench@example.com', 'bench')
+    other = get_user_model().objects.create_user('other', 'other@example.com', 'other')
+    category = Category.objects.create(name='Work', user=user)
+    tags = [Tag.objects.create(name=f'Tag {i}', user=user) for i in range(3)]
+    due = timezone.now() + timezone.timedelta(days=1)
+    for i in range(COUNT):
+        task = Task.objects.create(title=f'Task {i}', user=user, category=category, due_date=due)
+        task.tags.add(*tags)
+        TaskShare.objects.create(task=task, shared_with=other)
+        TaskNotification.objects.create(task=task, user=user, scheduled_time=due)
+    return user
+
+def main():
+    user = create_tasks()
+    tasks = Task.objects.visible_to(user)
+
+    def model_serializer():
+        return TaskSerializer(TaskSerializer.setup_eager_loading(tasks), many=True).data
+
+    def values_serializer():
+        return TaskValuesSerializer(TaskValuesSerializer.values(tasks)).data
+
+    for label, func in [('TaskSerializer', model_serializer), ('TaskValuesSerializer', values_serializer)]:
+        best = timed(f'{label} ({COUNT} tasks)', func)
+        print(f'{"":<45} {best / COUNT * 1e6:9.1f} us/row')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Async versions of the hot read endpoints, for ASGI deployments.
+
+Under an ASGI server every synchronous view runs in the sync-to-async thread
+pool. These views run on the event loop instead: authentication only
+decodes the JWT and loads the user with aget(), and the rows are read with
+the async ORM. They return the same data as the matching TaskViewSet,
+TagViewSet and CategoryViewSet endpoints and are routed under api/async/.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.http import condition, require_GET
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .cache import aload_generation, cache_response, get_cached_response, user_etag, user_last_modified
+from .models import Task
+from .pagination import TaskCursorPagination
+from .serializers import CategorySerializer, TagSerializer, TaskNotificationSerializer, TaskSerializer
+from .values_serializers import TaskValuesSerializer
+from .views import CategoryViewSet, TagViewSet, TaskViewSet, upcoming_notifications_queryset
+
+# Query parameters handled by the pagination rather than the filter backends
+PAGINATION_PARAMS = {TaskCursorPagination.cursor_query_param, TaskCursorPagination.page_size_query_param}
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication whose user lookup uses the async ORM"""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        try:
+            user = await get_user_model().objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except get_user_model().DoesNotExist:
+            raise exceptions.AuthenticationFailed('User not found', code='user_not_found')
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+def async_api_view(view):
+    """
+    Authenticate an async view like IsAuthenticated + JWTAuthentication.
+
+    The view receives a DRF Request, so query_params and the pagination and
+    cache helpers work as in the sync views. API errors become the same
+    {"detail": ...} responses DRF sends.
+    """
+    @require_GET
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request = Request(request)
+        try:
+            result = await AsyncJWTAuthentication().aauthenticate(request)
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = result
+            # The cache keys and validators need it, and condition() cannot await
+            await aload_generation(request)
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = json_response({'detail': exc.detail}, status=exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response['WWW-Authenticate'] = AsyncJWTAuthentication().authenticate_header(request)
+            return response
+    return wrapper
+
+def viewset_for(viewset_class, request, action):
+    """An instance of the sync viewset, used to reuse its filter configuration"""
+    view = viewset_class(request=request, format_kwarg=None, action=action, kwargs={})
+    view.args = ()
+    return view
+
+async def cached_list(request, build):
+    """Serve a list through the response cache, like CachedListMixin"""
+    key, data = get_cached_response(request)
+    if data is not None:
+        response = json_response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    data = await build()
+    cache_response(key, data)
+    response = json_response(data)
+    response['X-Cache'] = 'MISS'
+    return response
+
+user_conditional = condition(etag_func=user_etag, last_modified_func=user_last_modified)
+
+@async_api_view
+@user_conditional
+async def task_list(request):
+    """Async TaskViewSet.list"""
+    view = viewset_for(TaskViewSet, request, 'list')
+
+    async def build():
+        queryset = view.get_queryset()
+        if set(request.query_params) - PAGINATION_PARAMS:
+            # django-filter validates model choices with queries, which
+            # must run in a thread
+            queryset = await sync_to_async(view.filter_queryset)(queryset)
+        paginator = TaskCursorPagination()
+        if TaskSerializer.sparse_fieldset(request) is None:
+            # The values() fast path of TaskViewSet.paginated_response
+            page = await paginator.apaginate_queryset(TaskValuesSerializer.values(queryset), request, view=view)
+            results = await TaskValuesSerializer(page).adata()
+        else:
+            page = await paginator.apaginate_queryset(queryset, request, view=view)
+            results = TaskSerializer(page, many=True, context={'request': request}).data
+        return {
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': results,
+        }
+    return await cached_list(request, build)
+
+@async_api_view
+@user_conditional
+async def task_detail(request, pk):
+    """Async TaskViewSet.retrieve"""
+    view = viewset_for(TaskViewSet, request, 'retrieve')
+    try:
+        task = await view.get_queryset().aget(pk=pk)
+    except Task.DoesNotExist:
+        raise exceptions.NotFound('No Task matches the given query.')
+    # The request selects the ?fields= the sparse queryset was trimmed to
+    return json_response(TaskSerializer(task, context={'request': request}).data)
+
+def upcoming_etag(request, *args, **kwargs):
+    """upcoming_notifications_etag, from the count upcoming_notifications read beforehand"""
+    return user_etag(request, extra=request.upcoming_count)
+
+@condition(etag_func=upcoming_etag)
+async def render_upcoming_notifications(request):
+    notifications = upcoming_notifications_queryset(request.user).select_related('task')
+    rows = [notification async for notification in notifications.aiterator()]
+    return json_response(TaskNotificationSerializer(rows, many=True).data)
+
+@async_api_view
+async def upcoming_notifications(request):
+    """Async TaskViewSet.upcoming_notifications"""
+    # condition() calls the ETag function synchronously, so the count it
+    # needs is read with the async ORM first
+    request.upcoming_count = await upcoming_notifications_queryset(request.user).acount()
+    return await render_upcoming_notifications(request)
+
+@async_api_view
+async def tag_list(request):
+    """Async TagViewSet.list"""
+    view = viewset_for(TagViewSet, request, 'list')
+
+    async def build():
+        tags = view.filter_queryset(view.get_queryset())
+        return TagSerializer([tag async for tag in tags.aiterator()], many=True).data
+    return await cached_list(request, build)
+
+@async_api_view
+@user_conditional
+async def popular_tags(request):
+    """Async TagViewSet.popular"""
+    tags = viewset_for(TagViewSet, request, 'popular').get_queryset().order_by('-task_count', 'name')[:10]
+    return json_response(TagSerializer([tag async for tag in tags.aiterator()], many=True).data)
+
+@async_api_view
+async def category_list(request):
+    """Async CategoryViewSet.list"""
+    view = viewset_for(CategoryViewSet, request, 'list')
+
+    async def build():
+        categories = view.filter_queryset(view.get_queryset())
+        return CategorySerializer([category async for category in categories.aiterator()], many=True).data
+    return await cached_list(request, build)
@@ -0,0 +1,165 @@
+import hashlib
+import math
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from rest_framework.response import Response
+
+RESPONSE_KEY = 'todo:response:{user_id}:{generation}:{digest}'
+STATS_KEY = 'todo:stats:{name}'
+
+def get_cache():
+    """Return the cache backend used for API responses"""
+    return caches[getattr(settings, 'TODO_RESPONSE_CACHE_ALIAS', 'default')]
+
+def _generation_row(user_id):
+    from .models import UserCacheGeneration
+    return UserCacheGeneration.objects.filter(user_id=user_id).values_list('generation', 'modified')
+
+def _generation_or_new(row):
+    # A user without a row (created without signals) is treated as modified
+    # now, which can only cause an unneeded full response
+    return row or (0, math.ceil(time.time()))
+
+def get_generation(request):
+    """
+    Return (generation, last modified time) of the requesting user.
+
+    The generation lives in the database, next to the data it versions, so
+    the validators and cache keys built from it are the same in every
+    worker process. It is read once per request; async views load it with
+    aload_generation() first, because condition() calls its functions
+    synchronously.
+    """
+    if not hasattr(request, '_cache_generation'):
+        request._cache_generation = _generation_or_new(_generation_row(request.user.pk).first())
+    return request._cache_generation
+
+async def aload_generation(request):
+    """Read the generation get_generation() returns with the async ORM"""
+    request._cache_generation = _generation_or_new(await _generation_row(request.user.pk).afirst())
+
+def _bump_generations(user_ids):
+    from .models import UserCacheGeneration
+    now = math.ceil(time.time())
+    # HTTP dates only have second precision, so keep each change at least a
+    # second after the previous one or If-Modified-Since could match
+    bumped = UserCacheGeneration.objects.filter(user_id__in=user_ids).update(
+        generation=F('generation') + 1,
+        modified=Greatest(Value(now), F('modified') + 1)
+    )
+    if bumped < len(user_ids):
+        # New rows are seeded from the clock rather than starting at 1, so a
+        # user whose row was removed can never come back at a generation
+        # that is still part of a cached response key
+        UserCacheGeneration.objects.bulk_create([
+            UserCacheGeneration(user_id=user_id, generation=time.time_ns(), modified=now)
+            for user_id in user_ids
+        ], ignore_conflicts=True)
+
+def invalidate_users(user_ids):
+    """
+    Invalidate every cached response of the given users.
+
+    The generation is bumped in the write's own transaction. A read racing
+    the commit either sees the old generation with the old data, or caches
+    the new data under the old generation, whose key is never used again.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        _bump_generations(user_ids)
+
+def task_viewer_ids(task_ids):
+    """Return the ids of every user who can see any of the given tasks"""
+    from .models import TaskVisibility
+    return set(
+        TaskVisibility.objects.filter(task_id__in=task_ids).values_list('user_id', flat=True)
+    )
+
+def invalidate_tasks(task_ids, extra_user_ids=()):
+    """Invalidate the cached responses of everyone who can see the given tasks"""
+    invalidate_users(task_viewer_ids(task_ids) | set(extra_user_ids))
+
+def _record(name):
+    cache = get_cache()
+    key = STATS_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+def get_cache_stats():
+    """Return the response cache hit and miss counters"""
+    cache = get_cache()
+    return {
+        name: cache.get(STATS_KEY.format(name=name), 0)
+        for name in ('hits', 'misses')
+    }
+
+def _request_digest(request):
+    params = sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists()
+    )
+    return hashlib.md5(f'{request.path}?{params}'.encode('utf-8')).hexdigest()
+
+def response_cache_key(request):
+    """Build the cache key for a request from its user, path and query params"""
+    generation, _ = get_generation(request)
+    return RESPONSE_KEY.format(
+        user_id=request.user.pk,
+        generation=generation,
+        digest=_request_digest(request)
+    )
+
+def user_etag(request, *args, extra='', **kwargs):
+    """
+    ETag for responses that depend only on the requesting user's data.
+
+    Built from the user's cache generation, so it changes whenever anything
+    the user can see changes and costs a single primary key lookup.
+    Extra values that the response also depends on can be passed as
+    ``extra``.
+    """
+    generation, _ = get_generation(request)
+    value = f'{request.user.pk}:{generation}:{_request_digest(request)}:{extra}'
+    return hashlib.md5(value.encode('utf-8')).hexdigest()
+
+def user_last_modified(request, *args, **kwargs):
+    """Last-Modified counterpart of user_etag"""
+    _, modified = get_generation(request)
+    return datetime.fromtimestamp(modified, tz=dt_timezone.utc)
+
+def get_cached_response(request):
+    """Return the cache key of a list request and its cached data (None on a miss)"""
+    key = response_cache_key(request)
+    data = get_cache().get(key)
+    _record('hits' if data is not None else 'misses')
+    return key, data
+
+def cache_response(key, data):
+    get_cache().set(key, data, getattr(settings, 'TODO_RESPONSE_CACHE_TIMEOUT', 300))
+
+class CachedListMixin:
+    """
+    Serve list responses from the per-user response cache.
+
+    Cached entries are never deleted explicitly; the signals in signals.py
+    bump the generation of every affected user, which moves them to new keys.
+    """
+    def list(self, request, *args, **kwargs):
+        key, data = get_cached_response(request)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache_response(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
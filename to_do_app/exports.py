@@ -0,0 +1,68 @@
+import csv
+import json
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import TaskSerializer
+
+# Columns of the CSV export. Tags and share recipients are joined with
+# LIST_SEPARATOR into a single cell.
+CSV_COLUMNS = [
+    'id', 'title', 'description', 'completed', 'created_at', 'updated_at',
+    'due_date', 'owner_username', 'category', 'priority', 'tags', 'shared_with'
+]
+LIST_SEPARATOR = ';'
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    Selects the NDJSON export via ?format=ndjson or the Accept header.
+
+    The export itself is streamed by the view; this only renders error
+    responses, as plain JSON.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+class CSVRenderer(JSONRenderer):
+    """CSV counterpart of NDJSONRenderer; errors are still rendered as JSON"""
+    media_type = 'text/csv'
+    format = 'csv'
+
+class Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output"""
+    def write(self, value):
+        return value
+
+def iter_tasks(queryset, chunk_size=None):
+    """
+    Yield the tasks of an eager-loading queryset as TaskSerializer
+    representations.
+
+    Rows are fetched with iterator(), so the prefetches of
+    TaskSerializer.setup_eager_loading run once per chunk and memory use
+    does not grow with the number of tasks.
+    """
+    chunk_size = chunk_size or getattr(settings, 'TODO_EXPORT_CHUNK_SIZE', 500)
+    serializer = TaskSerializer()
+    for task in queryset.iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(task)
+
+def ndjson_lines(queryset, chunk_size=None):
+    for task in iter_tasks(queryset, chunk_size):
+        yield json.dumps(task, cls=JSONEncoder, separators=(',', ':')) + '\n'
+
+def csv_row(task):
+    """Flatten a task representation into CSV_COLUMNS"""
+    row = {key: task[key] for key in CSV_COLUMNS if key in task}
+    row['category'] = task['category']['name'] if task['category'] else ''
+    row['tags'] = LIST_SEPARATOR.join(tag['name'] for tag in task['tags'])
+    row['shared_with'] = LIST_SEPARATOR.join(share['shared_with_username'] for share in task['shares'])
+    return [row[key] for key in CSV_COLUMNS]
+
+def csv_lines(queryset, chunk_size=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for task in iter_tasks(queryset, chunk_size):
+        yield writer.writerow(csv_row(task))
@@ -0,0 +1,204 @@
+import codecs
+import csv
+import json
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache import invalidate_users
+from .exports import LIST_SEPARATOR
+from .models import Task, Category, Tag, TaskVisibility
+from .serializers import TaskBulkSerializer, TaskSerializer, schedule_task_notifications
+from .stats import record_new_visibility
+
+# Fields of an imported row that are passed to TaskSerializer for validation;
+# everything else (ids, timestamps, owner, shares) is ignored
+TASK_FIELDS = ['title', 'description', 'completed', 'due_date', 'priority', 'category_id', 'tag_ids', 'tag_names']
+
+def read_ndjson(stream):
+    """Yield (line number, row) for a binary NDJSON stream, row being None for bad JSON"""
+    for number, line in enumerate(codecs.iterdecode(stream, 'utf-8'), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+def read_csv(stream):
+    """Yield (line number, row) for a binary CSV stream with a header line, like the export writes"""
+    reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8'))
+    for row in reader:
+        # Empty cells mean "not given", as the export writes them for nulls
+        yield reader.line_num, {key: value for key, value in row.items() if key and value != ''}
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+class ImportFormatError(ValueError):
+    """The uploaded stream is not UTF-8 or not readable in the given format"""
+
+def task_data(row):
+    """
+    Turn an imported row into TaskSerializer input plus a category name.
+
+    Besides TaskSerializer's own fields, rows may name their category and
+    tags the way the export writes them: ``category`` as a name or nested
+    category, ``tags`` as nested tags, names or a LIST_SEPARATOR joined
+    string.
+    """
+    data = {key: row[key] for key in TASK_FIELDS if key in row}
+    category = row.get('category')
+    if isinstance(category, dict):
+        category = category.get('name')
+    tags = row.get('tags')
+    if isinstance(tags, str):
+        tags = [name.strip() for name in tags.split(LIST_SEPARATOR) if name.strip()]
+    if tags:
+        names = [tag.get('name') if isinstance(tag, dict) else tag for tag in tags]
+        data['tag_names'] = list(data.get('tag_names') or []) + [name for name in names if name]
+    return data, str(category) if category else None
+
+class TaskImporter:
+    """
+    Import tasks for one user from an NDJSON or CSV stream.
+
+    The stream is read a line at a time and handled in chunks of
+    TODO_IMPORT_CHUNK_SIZE rows: each row is validated with TaskSerializer's
+    rules, the chunk's categories and tags are looked up (and missing ones
+    created) with one query per kind, and the valid rows are written with
+    bulk inserts in a transaction of their own. Rows with errors are
+    skipped and reported by line; only the first TODO_IMPORT_MAX_ERRORS
+    errors are kept, so memory use does not grow with the file.
+    """
+    def __init__(self, user, chunk_size=None, max_errors=None):
+        self.user = user
+        self.chunk_size = chunk_size or getattr(settings, 'TODO_IMPORT_CHUNK_SIZE', 500)
+        self.max_errors = max_errors if max_errors is not None else getattr(settings, 'TODO_IMPORT_MAX_ERRORS', 100)
+        self.report = {'rows': 0, 'imported': 0, 'failed': 0, 'errors': []}
+
+    def run(self, stream, format, progress=None):
+        """
+        Import the stream, calling ``progress(report)`` after every chunk.
+
+        An unreadable stream raises ImportFormatError; the chunks before
+        the bad line stay imported.
+        """
+        rows = READERS[format](stream)
+        while True:
+            try:
+                chunk = list(islice(rows, self.chunk_size))
+            except (UnicodeDecodeError, csv.Error) as e:
+                raise ImportFormatError(str(e)) from e
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+            if progress:
+                progress(self.report)
+        return self.report
+
+    def add_error(self, line, errors):
+        self.report['failed'] += 1
+        if len(self.report['errors']) < self.max_errors:
+            self.report['errors'].append({'line': line, 'errors': errors})
+
+    def import_chunk(self, chunk):
+        self.report['rows'] += len(chunk)
+        valid = []
+        for line, row in chunk:
+            if row is None:
+                self.add_error(line, {'non_field_errors': ['Invalid JSON object']})
+                continue
+            data, category = task_data(row)
+            serializer = TaskSerializer(data=data)
+            if serializer.is_valid():
+                valid.append((line, serializer.validated_data, category))
+            else:
+                self.add_error(line, serializer.errors)
+
+        # Referenced categories and tags must belong to the user, checked for
+        # the whole chunk with one query each
+        category_ids = set(Category.objects.filter(
+            user=self.user,
+            id__in={vd['category_id'] for _, vd, _ in valid if vd.get('category_id')}
+        ).values_list('id', flat=True))
+        tag_ids = set(Tag.objects.filter(
+            user=self.user,
+            id__in={tag_id for _, vd, _ in valid for tag_id in vd.get('tag_ids') or []}
+        ).values_list('id', flat=True))
+        rows = []
+        for line, vd, category in valid:
+            errors = {}
+            if vd.get('category_id') and vd['category_id'] not in category_ids:
+                errors['category_id'] = 'Category not found or does not belong to user'
+            if category and len(category) > Category._meta.get_field('name').max_length:
+                errors['category'] = 'Category name is too long'
+            if any(tag_id not in tag_ids for tag_id in vd.get('tag_ids') or []):
+                errors['tag_ids'] = 'One or more tags do not exist or do not belong to you'
+            if any(len(name) > Tag._meta.get_field('name').max_length for name in vd.get('tag_names') or []):
+                errors['tag_names'] = 'Tag names can be at most 50 characters long'
+            if errors:
+                self.add_error(line, errors)
+            else:
+                rows.append((vd, category))
+
+        if rows:
+            with transaction.atomic():
+                self.write(rows)
+            self.report['imported'] += len(rows)
+
+    def write(self, rows):
+        categories = self.resolve_categories({category for _, category in rows if category})
+        tags = Tag.objects.resolve_names(
+            self.user.pk, {name for vd, _ in rows for name in vd.get('tag_names') or []}
+        )
+
+        tasks = []
+        for vd, category in rows:
+            fields = TaskBulkSerializer._task_fields(vd)
+            if category and not vd.get('category_id'):
+                fields['category_id'] = categories[category].pk
+            tasks.append(Task(user=self.user, **fields))
+        Task.objects.bulk_create(tasks)
+        TaskVisibility.objects.bulk_create([
+            TaskVisibility(user_id=self.user.pk, task_id=task.pk, permission='OWNER')
+            for task in tasks
+        ])
+        record_new_visibility((self.user.pk, task) for task in tasks)
+
+        TaskTag = Task.tags.through
+        tag_rows = [
+            TaskTag(task_id=task.pk, tag_id=tag_id)
+            for task, (vd, _) in zip(tasks, rows)
+            for tag_id in set(vd.get('tag_ids') or []) | {tags[name].pk for name in vd.get('tag_names') or []}
+        ]
+        TaskTag.objects.bulk_create(tag_rows)
+        Tag.objects.add_task_counts(Counter(row.tag_id for row in tag_rows))
+
+        dated = [task for task in tasks if task.due_date]
+        if dated:
+            prefs = TaskBulkSerializer._notification_preferences({self.user.pk})
+            schedule_task_notifications(dated, prefs, created=True)
+
+        # Bulk writes skip model signals, so invalidate cached responses here
+        invalidate_users([self.user.pk])
+
+    def resolve_categories(self, names):
+        """Return {name: category} for the user, creating the missing categories"""
+        if not names:
+            return {}
+        categories = Category.objects.filter(user=self.user, name__in=names)
+        found = {category.name: category for category in categories}
+        missing = names - found.keys()
+        if missing:
+            Category.objects.bulk_create(
+                [Category(name=name, user=self.user) for name in missing],
+                ignore_conflicts=True
+            )
+            found.update({
+                category.name: category
+                for category in Category.objects.filter(user=self.user, name__in=missing)
+            })
+        return found
@@ -0,0 +1,144 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from ...notifications import (
+    claim_notifications, deliver_notifications, open_connection, reschedule_deferred_preferences
+)
+from ...scheduler import ReminderWheel
+
+class Command(BaseCommand):
+    help = 'Send due task reminders with several workers that claim rows in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Number of worker threads')
+        parser.add_argument('--batch-size', type=int, default=None, help='Reminders claimed per batch')
+        parser.add_argument('--lease', type=int, default=None, help='Seconds before an unfinished claim expires')
+        parser.add_argument('--interval', type=float, default=10, help='Seconds to wait when nothing is due')
+        parser.add_argument('--once', action='store_true', help='Exit when nothing is due instead of polling')
+        parser.add_argument(
+            '--wheel', action='store_true',
+            help='Send each reminder at its scheduled time from an in-memory schedule, with one worker; '
+                 '--interval then sets how often a full sweep runs'
+        )
+        parser.add_argument('--window', type=int, default=3600, help='Seconds ahead the --wheel schedule holds')
+        parser.add_argument('--tick', type=float, default=1, help='Seconds between --wheel checks for new reminders')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.processed = 0
+        batch_size = options['batch_size']
+        if batch_size is None:
+            batch_size = getattr(settings, 'TODO_NOTIFICATION_BATCH_SIZE', 100)
+        worker_args = (batch_size, options['lease'], options['interval'], options['once'])
+        if options['wheel'] and options['once']:
+            raise CommandError('--wheel keeps running until stopped and cannot be combined with --once')
+
+        start = time.monotonic()
+        if options['wheel']:
+            try:
+                self.run_wheel(batch_size, options['lease'], options['interval'], options['window'], options['tick'])
+            except KeyboardInterrupt:
+                pass
+        elif options['workers'] <= 1:
+            # Run in this thread, on the caller's database connection
+            self.work(*worker_args)
+        else:
+            threads = [
+                threading.Thread(target=self.work_in_thread, args=worker_args, name=f'dispatcher-{i}')
+                for i in range(options['workers'])
+            ]
+            for thread in threads:
+                thread.start()
+            try:
+                while any(thread.is_alive() for thread in threads):
+                    for thread in threads:
+                        thread.join(0.5)
+            except KeyboardInterrupt:
+                self.stop.set()
+                for thread in threads:
+                    thread.join()
+
+        elapsed = time.monotonic() - start
+        rate = self.processed / elapsed if elapsed else 0
+        self.stdout.write(f'Processed {self.processed} notifications in {elapsed:.1f}s ({rate:.1f}/s)')
+
+    def work_in_thread(self, *args):
+        try:
+            self.work(*args)
+        finally:
+            # Each thread opens its own database connections
+            connections.close_all()
+
+    def work(self, batch_size, lease, interval, once):
+        """Claim and deliver batches until stopped, or until nothing is due with --once"""
+        email = None
+        try:
+            while not self.stop.is_set():
+                try:
+                    # Preference changes too large to apply in the request
+                    reschedule_deferred_preferences()
+                    token = claim_notifications(batch_size, lease)
+                    if token is not None:
+                        email = self.deliver(email, token)
+                except Exception as e:
+                    # Claimed rows are retried by any worker once their lease expires
+                    self.stderr.write(f'Dispatch failed: {e}')
+                    self.stop.wait(interval)
+                    continue
+                if token is None:
+                    if once:
+                        break
+                    self.stop.wait(interval)
+        finally:
+            if email is not None:
+                email.close()
+
+    def deliver(self, email, token):
+        """Send one claimed batch, opening the email connection on first use"""
+        email = email or open_connection()
+        handled = deliver_notifications(token, email)
+        with self.lock:
+            self.processed += handled
+        return email
+
+    def run_wheel(self, batch_size, lease, interval, window, tick):
+        """
+        Fire reminders at their due time from a ReminderWheel.
+
+        Every ``interval`` seconds a normal sweep also claims anything due,
+        which covers digests, expired leases and rows the wheel missed.
+        """
+        wheel = ReminderWheel(window)
+        email = None
+        next_sweep = 0
+        try:
+            while not self.stop.is_set():
+                try:
+                    if time.monotonic() >= next_sweep:
+                        reschedule_deferred_preferences()
+                        while (token := claim_notifications(batch_size, lease)) is not None:
+                            email = self.deliver(email, token)
+                        next_sweep = time.monotonic() + interval
+                    wheel.refresh()
+                    due = wheel.pop_due()
+                    for i in range(0, len(due), batch_size):
+                        token = claim_notifications(batch_size, lease, ids=due[i:i + batch_size])
+                        if token is not None:
+                            email = self.deliver(email, token)
+                except Exception as e:
+                    self.stderr.write(f'Dispatch failed: {e}')
+                    self.stop.wait(interval)
+                    continue
+                wait = tick
+                if wheel.next_due() is not None:
+                    wait = min(wait, max((wheel.next_due() - timezone.now()).total_seconds(), 0))
+                self.stop.wait(wait)
+        finally:
+            if email is not None:
+                email.close()
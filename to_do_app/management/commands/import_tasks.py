@@ -0,0 +1,54 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ...imports import READERS, ImportFormatError, TaskImporter
+
+class Command(BaseCommand):
+    help = 'Import tasks for a user from an NDJSON or CSV file, such as one written by /api/tasks/export/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User who will own the imported tasks')
+        parser.add_argument('path', help='File to import')
+        parser.add_argument(
+            '--format', choices=sorted(READERS), default=None,
+            help='File format (default: csv for .csv files, ndjson otherwise)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Rows validated and written per transaction (TODO_IMPORT_CHUNK_SIZE)'
+        )
+        parser.add_argument('--max-errors', type=int, default=None, help='Errors to report (TODO_IMPORT_MAX_ERRORS)')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['username']}' not found")
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        format = options['format'] or ('csv' if options['path'].lower().endswith('.csv') else 'ndjson')
+
+        importer = TaskImporter(user, chunk_size=options['chunk_size'], max_errors=options['max_errors'])
+        start = time.monotonic()
+
+        def progress(report):
+            self.stdout.write(f"{report['rows']} rows read, {report['imported']} imported, {report['failed']} failed")
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                report = importer.run(stream, format, progress=progress)
+        except OSError as e:
+            raise CommandError(f'Could not open {options["path"]}: {e}')
+        except ImportFormatError as e:
+            raise CommandError(f"Stopped after {importer.report['rows']} rows: {e}")
+
+        for error in report['errors']:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        if report['failed'] > len(report['errors']):
+            self.stderr.write(f"... and {report['failed'] - len(report['errors'])} more errors")
+
+        elapsed = time.monotonic() - start
+        rate = report['imported'] / elapsed if elapsed else 0
+        self.stdout.write(f"Imported {report['imported']} of {report['rows']} tasks in {elapsed:.1f}s ({rate:.1f}/s)")
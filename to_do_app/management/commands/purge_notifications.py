@@ -0,0 +1,74 @@
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from ...cache import invalidate_tasks
+from ...models import TaskNotification
+
+class Command(BaseCommand):
+    help = 'Delete (and optionally archive) finished task notifications older than a number of days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Purge notifications unchanged for this many days (TODO_NOTIFICATION_RETENTION_DAYS)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per transaction')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between batches')
+        parser.add_argument('--archive', help='Append the purged rows to this file as JSON lines')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be purged')
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days is None:
+            days = getattr(settings, 'TODO_NOTIFICATION_RETENTION_DAYS', 90)
+        if days < 0 or options['batch_size'] < 1:
+            raise CommandError('--days must not be negative and --batch-size must be positive')
+        purgeable = TaskNotification.objects.purgeable(timezone.now() - timedelta(days=days))
+
+        if options['dry_run']:
+            self.stdout.write(f'Would purge {purgeable.count()} notifications older than {days} days')
+            return
+
+        archive = open(options['archive'], 'a') if options['archive'] else None
+        start = time.monotonic()
+        purged = 0
+        try:
+            while True:
+                with transaction.atomic():
+                    batch = self.purge_batch(purgeable, options['batch_size'], archive)
+                if not batch:
+                    break
+                purged += batch
+                if options['sleep']:
+                    time.sleep(options['sleep'])
+        finally:
+            if archive is not None:
+                archive.close()
+
+        elapsed = time.monotonic() - start
+        rate = purged / elapsed if elapsed else 0
+        self.stdout.write(f'Purged {purged} notifications in {elapsed:.1f}s ({rate:.1f}/s)')
+
+    def purge_batch(self, purgeable, batch_size, archive):
+        """Delete one batch, returning its size"""
+        if archive is None:
+            rows = list(purgeable.order_by('pk').values('id', 'task_id')[:batch_size])
+        else:
+            rows = list(purgeable.order_by('pk').values()[:batch_size])
+            for row in rows:
+                archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            archive.flush()
+        if not rows:
+            return 0
+        # Queryset deletes of notifications leave cache invalidation to the
+        # caller, so one invalidation covers the batch
+        TaskNotification.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        invalidate_tasks({row['task_id'] for row in rows})
+        return len(rows)
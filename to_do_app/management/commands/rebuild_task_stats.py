@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import stats
+
+class Command(BaseCommand):
+    help = 'Recount the per-user task statistics, or check them for drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', help='Only this user (repeatable)')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Report counters that differ from a recount instead of rebuilding; fails if any do'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            users = dict(get_user_model().objects.filter(
+                username__in=options['usernames']
+            ).values_list('username', 'id'))
+            missing = set(options['usernames']) - users.keys()
+            if missing:
+                raise CommandError(f"Users not found: {', '.join(sorted(missing))}")
+            user_ids = list(users.values())
+
+        if not options['check']:
+            groups = stats.rebuild(user_ids)
+            self.stdout.write(f'Rebuilt {groups} task statistics groups')
+            return
+
+        drift = stats.find_drift(user_ids)
+        for (user_id, category_id, priority, completed), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f'user {user_id}, category {category_id}, {priority}, completed={completed}: '
+                f'stored {stored}, actual {actual}'
+            )
+        if drift:
+            raise CommandError(f'{len(drift)} task statistics groups have drifted; run rebuild_task_stats')
+        self.stdout.write('Task statistics are consistent')
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_visibility(apps, schema_editor):
+    Task = apps.get_model('to_do_app', 'Task')
+    TaskShare = apps.get_model('to_do_app', 'TaskShare')
+    TaskVisibility = apps.get_model('to_do_app', 'TaskVisibility')
+    TaskVisibility.objects.bulk_create(
+        [
+            TaskVisibility(user_id=user_id, task_id=task_id, permission='OWNER')
+            for task_id, user_id in Task.objects.values_list('id', 'user_id').iterator()
+        ],
+        batch_size=500,
+    )
+    TaskVisibility.objects.bulk_create(
+        [
+            TaskVisibility(user_id=user_id, task_id=task_id, permission=permission)
+            for task_id, user_id, permission in TaskShare.objects.values_list(
+                'task_id', 'shared_with_id', 'permission'
+            ).iterator()
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0006_tag_task_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskVisibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('permission', models.CharField(choices=[('OWNER', 'Owner'), ('VIEW', 'View Only'), ('EDIT', 'Can Edit'), ('DELETE', 'Can Delete')], default='VIEW', max_length=10)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visibility', to='to_do_app.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_visibility', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'task visibility',
+                'unique_together': {('user', 'task')},
+            },
+        ),
+        migrations.RunPython(populate_visibility, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0007_taskvisibility'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'completed'], name='task_user_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'priority'], name='task_user_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'category'], name='task_user_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'due_date'], name='task_user_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', '-created_at'], name='task_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasknotification',
+            index=models.Index(fields=['status', 'scheduled_time'], name='notif_status_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasknotification',
+            index=models.Index(fields=['user', 'status', 'scheduled_time'], name='notif_user_status_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskshare',
+            index=models.Index(fields=['shared_with', 'task'], name='share_with_task_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0008_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasknotification',
+            name='claim_token',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tasknotification',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
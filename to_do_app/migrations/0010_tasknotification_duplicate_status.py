@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0009_tasknotification_claim'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tasknotification',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('SENT', 'Sent'), ('FAILED', 'Failed'), ('DUPLICATE', 'Duplicate')], default='PENDING', max_length=10),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef, Q
+
+
+def collapse_pending_duplicates(apps, schema_editor):
+    # Keep the earliest pending reminder of each task and recipient, the one
+    # the sender would have picked, and retire the rest as duplicates
+    TaskNotification = apps.get_model('to_do_app', 'TaskNotification')
+    pending = TaskNotification.objects.filter(status='PENDING')
+    earlier = pending.filter(
+        task_id=OuterRef('task_id'),
+        user_id=OuterRef('user_id'),
+    ).filter(
+        Q(scheduled_time__lt=OuterRef('scheduled_time')) |
+        Q(scheduled_time=OuterRef('scheduled_time'), pk__lt=OuterRef('pk'))
+    )
+    duplicate_ids = list(pending.filter(Exists(earlier)).values_list('pk', flat=True))
+    TaskNotification.objects.filter(pk__in=duplicate_ids).update(
+        status='DUPLICATE',
+        error_message='Duplicate notification - another notification was pending for this task',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0010_tasknotification_duplicate_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_pending_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tasknotification',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('task', 'user'), name='notif_one_pending_per_task'),
+        ),
+        # Only the pending reminder is unique now; moving it back to a time
+        # that already has a sent or cancelled row must not collide
+        migrations.AlterUniqueTogether(
+            name='tasknotification',
+            unique_together=set(),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0011_one_pending_notification_per_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationpreference',
+            name='reschedule_pending',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='tasknotification',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('SENT', 'Sent'), ('FAILED', 'Failed'), ('DUPLICATE', 'Duplicate'), ('CANCELLED', 'Cancelled')], default='PENDING', max_length=10),
+        ),
+    ]
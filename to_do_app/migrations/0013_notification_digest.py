@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0012_notification_rescheduling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationpreference',
+            name='digest_frequency',
+            field=models.CharField(choices=[('IMMEDIATE', 'One email per task'), ('HOURLY', 'Hourly digest'), ('DAILY', 'Daily digest')], default='IMMEDIATE', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notificationpreference',
+            name='last_digest_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
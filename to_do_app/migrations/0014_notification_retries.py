@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0013_notification_digest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasknotification',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tasknotification',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='tasknotification',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('SENT', 'Sent'), ('FAILED', 'Failed'), ('DUPLICATE', 'Duplicate'), ('CANCELLED', 'Cancelled'), ('DEAD', 'Dead')], default='PENDING', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='tasknotification',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='notif_status_next_attempt_idx'),
+        ),
+    ]
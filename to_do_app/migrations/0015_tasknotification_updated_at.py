@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:11
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Without this every existing row would look changed at migration time,
+    # and none of the backlog would be purgeable for another retention period
+    TaskNotification = apps.get_model('to_do_app', 'TaskNotification')
+    TaskNotification.objects.update(updated_at=Coalesce('sent_at', 'created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0014_notification_retries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasknotification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
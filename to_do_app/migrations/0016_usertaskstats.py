@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_stats(apps, schema_editor):
+    TaskVisibility = apps.get_model('to_do_app', 'TaskVisibility')
+    UserTaskStats = apps.get_model('to_do_app', 'UserTaskStats')
+    groups = TaskVisibility.objects.values(
+        'user_id', 'task__category_id', 'task__priority', 'task__completed'
+    ).annotate(n=Count('id')).order_by()
+    UserTaskStats.objects.bulk_create([
+        UserTaskStats(
+            user_id=group['user_id'],
+            category_id=group['task__category_id'] or 0,
+            priority=group['task__priority'],
+            completed=group['task__completed'],
+            count=group['n'],
+        )
+        for group in groups
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0015_tasknotification_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTaskStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_id', models.BigIntegerField(default=0)),
+                ('priority', models.CharField(choices=[('LOW', 'Low'), ('MEDIUM', 'Medium'), ('HIGH', 'High'), ('URGENT', 'Urgent')], max_length=10)),
+                ('completed', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user task stats',
+                'unique_together': {('user', 'category_id', 'priority', 'completed')},
+            },
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
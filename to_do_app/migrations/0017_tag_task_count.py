@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_tag_tasks(apps, schema_editor):
+    Tag = apps.get_model('to_do_app', 'Tag')
+    Task = apps.get_model('to_do_app', 'Task')
+    counts = Task.tags.through.objects.filter(
+        tag_id=OuterRef('pk')
+    ).order_by().values('tag_id').annotate(n=Count('pk')).values('n')
+    Tag.objects.update(task_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0016_usertaskstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', '-task_count', 'name'], name='tag_user_task_count_idx'),
+        ),
+        migrations.RunPython(count_tag_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:03
+
+import math
+import time
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_generations(apps, schema_editor):
+    # Start every existing user on a fresh generation, modified now
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserCacheGeneration = apps.get_model('to_do_app', 'UserCacheGeneration')
+    generation, modified = time.time_ns(), math.ceil(time.time())
+    UserCacheGeneration.objects.bulk_create([
+        UserCacheGeneration(user_id=user_id, generation=generation, modified=modified)
+        for user_id in User.objects.values_list('pk', flat=True).iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('to_do_app', '0017_tag_task_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCacheGeneration',
+            fields=[
+                ('user_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('generation', models.BigIntegerField()),
+                ('modified', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(create_generations, migrations.RunPython.noop),
+    ]
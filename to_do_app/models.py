@@ -1,24 +1,70 @@
-from django.db import models
+from collections import defaultdict
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, Value, When
 from django.contrib.auth import get_user_model
 
+class TagQuerySet(models.QuerySet):
+    def add_task_counts(self, deltas):
+        """
+        Add {tag_id: delta} to the stored task counts in a single UPDATE,
+        however many tags a write touches.
+        """
+        by_delta = defaultdict(list)
+        for tag_id, delta in deltas.items():
+            if delta:
+                by_delta[delta].append(tag_id)
+        if not by_delta:
+            return
+        self.filter(pk__in=[tag_id for tag_ids in by_delta.values() for tag_id in tag_ids]).update(
+            task_count=F('task_count') + Case(
+                *[When(pk__in=tag_ids, then=Value(delta)) for delta, tag_ids in by_delta.items()],
+                output_field=models.IntegerField()
+            )
+        )
+
+    def resolve_names(self, user_id, names):
+        """
+        Return {name: tag} for the given names, creating missing tags.
+
+        Existing tags are read in one query and the missing ones inserted in
+        a single bulk insert; conflicts with tags created concurrently are
+        ignored and picked up by re-reading.
+        """
+        names = set(names)
+        if not names:
+            return {}
+        tags = {tag.name: tag for tag in self.filter(user_id=user_id, name__in=names)}
+        missing = names - tags.keys()
+        if missing:
+            self.bulk_create(
+                [Tag(name=name, user_id=user_id, color='#FF0000') for name in missing],
+                ignore_conflicts=True
+            )
+            tags.update({tag.name: tag for tag in self.filter(user_id=user_id, name__in=missing)})
+        return tags
+
 class Tag(models.Model):
     name = models.CharField(max_length=50)
     color = models.CharField(max_length=7, default="#FF0000")  # Hex color code
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='tags')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Number of tasks using the tag, kept in step by the Task.tags signals
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = TagQuerySet.as_manager()
 
     class Meta:
         unique_together = ['name', 'user']  # Each user can have unique tag names
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['user', '-task_count', 'name'], name='tag_user_task_count_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.user.username})"
 
-    def task_count(self):
-        """Return the number of tasks using this tag"""
-        return self.tasks.count()
-
 class Category(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
@@ -33,6 +79,49 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Tasks the user owns or that are shared with them, annotated with the
+        user's permission. This is a single join on the unique (user, task)
+        visibility row, so it never needs DISTINCT.
+        """
+        return self.filter(visibility__user=user).annotate(
+            permission=F('visibility__permission')
+        )
+
+    def uncount(self):
+        """
+        Take the tasks out of the per-user statistics and Tag.task_count,
+        with a few grouped queries however many tasks there are. Runs
+        before the delete, while the visibility and tag rows still exist.
+        """
+        from .stats import record_deleted_tasks
+        task_ids = self.order_by().values('pk')
+        record_deleted_tasks(task_ids)
+        tag_counts = Task.tags.through.objects.filter(task_id__in=task_ids).values('tag_id').annotate(
+            n=Count('pk')
+        ).order_by().values_list('tag_id', 'n')
+        Tag.objects.add_task_counts({tag_id: -n for tag_id, n in tag_counts})
+
+    uncount.queryset_only = True
+
+    def delete(self):
+        """
+        Delete the tasks, uncounting them and invalidating the cached
+        responses of everyone who could see them once for the whole queryset
+        """
+        from .cache import invalidate_users, task_viewer_ids
+        with transaction.atomic(using=self.db, savepoint=False):
+            viewer_ids = task_viewer_ids(self.order_by().values('pk'))
+            self.uncount()
+            deleted = super().delete()
+            invalidate_users(viewer_ids)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 class Task(models.Model):
     PRIORITY_CHOICES = [
         ('LOW', 'Low'),
@@ -53,14 +142,25 @@ class Task(models.Model):
     shared_with = models.ManyToManyField(get_user_model(), through='TaskShare', related_name='shared_tasks')
     tags = models.ManyToManyField(Tag, related_name='tasks', blank=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'completed'], name='task_user_completed_idx'),
+            models.Index(fields=['user', 'priority'], name='task_user_priority_idx'),
+            models.Index(fields=['user', 'category'], name='task_user_category_idx'),
+            models.Index(fields=['user', 'due_date'], name='task_user_due_date_idx'),
+            models.Index(fields=['user', '-created_at'], name='task_user_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
     def tag_list(self):
         """Return a list of tag names for this task"""
+        if 'tags' in getattr(self, '_prefetched_objects_cache', {}):
+            return [tag.name for tag in self.tags.all()]
         return list(self.tags.values_list('name', flat=True))
 
 class TaskShare(models.Model):
@@ -79,10 +179,75 @@ class TaskShare(models.Model):
     class Meta:
         unique_together = ['task', 'shared_with']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['shared_with', 'task'], name='share_with_task_idx'),
+        ]
 
     def __str__(self):
         return f"{self.task.title} shared with {self.shared_with.username}"
 
+class TaskVisibility(models.Model):
+    """
+    Denormalized list of who can see a task: one row for the owner plus one
+    per share, kept in sync by the signals in signals.py. Lets task lists
+    filter on a single indexed (user, task) lookup instead of OR-ing the
+    owner and share joins, and carries the permission used by edit/delete
+    checks.
+    """
+    PERMISSION_CHOICES = [('OWNER', 'Owner')] + TaskShare.PERMISSION_CHOICES
+
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='task_visibility')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='visibility')
+    permission = models.CharField(max_length=10, choices=PERMISSION_CHOICES, default='VIEW')
+
+    class Meta:
+        unique_together = ['user', 'task']
+        verbose_name_plural = "task visibility"
+
+    def __str__(self):
+        return f"{self.task.title} visible to {self.user.username} ({self.permission})"
+
+class UserTaskStats(models.Model):
+    """
+    Number of tasks a user can see, per (category, priority, completed)
+    group. Kept up to date with +1/-1 deltas by the signals in signals.py
+    and by the bulk write paths, see stats.py. Tasks without a category are
+    counted under category_id NO_CATEGORY rather than NULL, so the unique
+    constraint covers them.
+    """
+    NO_CATEGORY = 0
+
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='task_stats')
+    # Not a foreign key: a deleted category's counts are moved to NO_CATEGORY
+    category_id = models.BigIntegerField(default=NO_CATEGORY)
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_CHOICES)
+    completed = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['user', 'category_id', 'priority', 'completed']
+        verbose_name_plural = "user task stats"
+
+    def __str__(self):
+        return f"{self.user.username}: {self.count} tasks ({self.category_id}, {self.priority}, {self.completed})"
+
+class UserCacheGeneration(models.Model):
+    """
+    Version of everything a user's cached responses depend on. The signals
+    bump it through cache.invalidate_users() in the same transaction as the
+    write, so every worker sees a change once it commits, whatever cache
+    backend holds the responses themselves.
+    """
+    # Not a foreign key: the generation is bumped while a user's tasks are
+    # deleted along with them
+    user_id = models.BigIntegerField(primary_key=True)
+    generation = models.BigIntegerField()
+    # Unix time in seconds of the last change, for Last-Modified
+    modified = models.BigIntegerField()
+
+    def __str__(self):
+        return f"Cache generation {self.generation} of user {self.user_id}"
+
 class NotificationPreference(models.Model):
     NOTIFICATION_TIMING_CHOICES = [
         ('1H', '1 hour before'),
@@ -94,20 +259,88 @@ class NotificationPreference(models.Model):
         ('1W', '1 week before'),
     ]
 
+    NOTIFICATION_TIMING_DELTAS = {
+        '1H': timedelta(hours=1),
+        '3H': timedelta(hours=3),
+        '6H': timedelta(hours=6),
+        '12H': timedelta(hours=12),
+        '24H': timedelta(hours=24),
+        '48H': timedelta(hours=48),
+        '1W': timedelta(weeks=1),
+    }
+
+    DIGEST_CHOICES = [
+        ('IMMEDIATE', 'One email per task'),
+        ('HOURLY', 'Hourly digest'),
+        ('DAILY', 'Daily digest'),
+    ]
+
+    DIGEST_PERIODS = {
+        'HOURLY': timedelta(hours=1),
+        'DAILY': timedelta(days=1),
+    }
+
     user = models.OneToOneField(get_user_model(), on_delete=models.CASCADE, related_name='notification_preference')
     email_notifications = models.BooleanField(default=True)
     notification_timing = models.CharField(max_length=3, choices=NOTIFICATION_TIMING_CHOICES, default='24H')
+    # Set when a change must be applied to too many reminders to do it in
+    # the request; the notification dispatcher picks it up
+    reschedule_pending = models.BooleanField(default=False)
+    digest_frequency = models.CharField(max_length=10, choices=DIGEST_CHOICES, default='IMMEDIATE')
+    last_digest_sent_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username}'s notification preferences"
 
+    def get_timing_delta(self):
+        """Return how long before the due date reminders are sent"""
+        return self.NOTIFICATION_TIMING_DELTAS[self.notification_timing]
+
+class TaskNotificationQuerySet(models.QuerySet):
+    def claimable(self, now):
+        """
+        Pending notifications that are due and not claimed by a dispatcher.
+
+        Failed notifications count once their next_attempt_at has passed. A
+        claim whose lease has expired counts as unclaimed, so rows held by a
+        worker that died are picked up again. Reminders of digest users wait
+        until their last digest is one period old.
+        """
+        digest_due = Q(user__notification_preference__isnull=True) | Q(
+            user__notification_preference__digest_frequency='IMMEDIATE'
+        ) | Q(user__notification_preference__last_digest_sent_at__isnull=True)
+        for frequency, period in NotificationPreference.DIGEST_PERIODS.items():
+            digest_due |= Q(
+                user__notification_preference__digest_frequency=frequency,
+                user__notification_preference__last_digest_sent_at__lte=now - period
+            )
+        return self.filter(
+            Q(status='PENDING', scheduled_time__lte=now) | Q(status='FAILED', next_attempt_at__lte=now),
+            digest_due
+        ).filter(Q(claimed_until__isnull=True) | Q(claimed_until__lte=now))
+
+    def scheduled(self):
+        """Reminders still to be sent: pending ones and failures with a retry scheduled"""
+        return self.filter(Q(status='PENDING') | Q(status='FAILED', next_attempt_at__isnull=False))
+
+    def purgeable(self, before):
+        """Finished notifications last changed before ``before``, excluding scheduled retries"""
+        return self.filter(
+            Q(status__in=['SENT', 'DUPLICATE', 'CANCELLED', 'DEAD']) |
+            Q(status='FAILED', next_attempt_at__isnull=True),
+            updated_at__lt=before
+        )
+
 class TaskNotification(models.Model):
     NOTIFICATION_STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('SENT', 'Sent'),
         ('FAILED', 'Failed'),
+        ('DUPLICATE', 'Duplicate'),
+        ('CANCELLED', 'Cancelled'),
+        ('DEAD', 'Dead'),
     ]
 
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='notifications')
@@ -117,10 +350,36 @@ class TaskNotification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     sent_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(blank=True)
+    # Set while a dispatcher worker owns the row, see notifications.claim_notifications
+    claim_token = models.UUIDField(null=True, blank=True, db_index=True)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    # Failed sends are retried with backoff until TODO_NOTIFICATION_MAX_ATTEMPTS,
+    # then the row is DEAD
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    # Watermark for the in-process scheduler; queryset updates that change
+    # when or whether a row is due set it explicitly
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = TaskNotificationQuerySet.as_manager()
 
     class Meta:
         ordering = ['-scheduled_time']
-        unique_together = ['task', 'user', 'scheduled_time']
+        constraints = [
+            # Scheduling upserts this row, so the sender never has to dedupe.
+            # Sent, cancelled and dead rows are history and may share a time
+            # with the pending one
+            models.UniqueConstraint(
+                fields=['task', 'user'],
+                condition=Q(status='PENDING'),
+                name='notif_one_pending_per_task'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'scheduled_time'], name='notif_status_sched_idx'),
+            models.Index(fields=['user', 'status', 'scheduled_time'], name='notif_user_status_sched_idx'),
+            models.Index(fields=['status', 'next_attempt_at'], name='notif_status_next_attempt_idx'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.task.title} to {self.user.username}"
\ No newline at end of file
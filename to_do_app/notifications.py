@@ -0,0 +1,320 @@
+import random
+import uuid
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import (
+    Case, DateTimeField, Exists, ExpressionWrapper, F, OuterRef, Subquery, Value, When
+)
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .cache import invalidate_tasks, invalidate_users
+from .models import NotificationPreference, Task, TaskNotification
+
+# The columns a reminder email needs, read as plain tuples instead of
+# Task/User instances
+Reminder = namedtuple(
+    'Reminder',
+    'pk task_id email title due_date description priority completed user_id digest_frequency attempts',
+    defaults=(None, None, 0)
+)
+REMINDER_FIELDS = [
+    'pk', 'task_id', 'user__email', 'task__title', 'task__due_date',
+    'task__description', 'task__priority', 'task__completed',
+    'user_id', 'user__notification_preference__digest_frequency', 'attempts',
+]
+
+def build_notification_email(reminder, connection=None):
+    """Build the reminder email for a Reminder row"""
+    return EmailMessage(
+        f'Task Due Soon: {reminder.title}',
+        render_to_string('notifications/task_due.txt', {'reminder': reminder}),
+        settings.DEFAULT_FROM_EMAIL,
+        [reminder.email],
+        connection=connection,
+    )
+
+def build_digest_email(reminders, connection=None):
+    """Build one email listing several Reminder rows of the same user"""
+    if len(reminders) == 1:
+        return build_notification_email(reminders[0], connection)
+    return EmailMessage(
+        f'{len(reminders)} Tasks Due Soon',
+        render_to_string('notifications/digest.txt', {'reminders': reminders}),
+        settings.DEFAULT_FROM_EMAIL,
+        [reminders[0].email],
+        connection=connection,
+    )
+
+def _send_batch(connection, batch):
+    """
+    Send a batch of (pks, message) pairs and return (sent pks, {pk: error}).
+
+    The whole batch goes out in one send_messages() call. If that fails the
+    messages are retried one at a time, so a single bad recipient only fails
+    its own notifications; a message the backend delivered before the error
+    can then be delivered twice, which is preferred over dropping the rest.
+    """
+    try:
+        connection.send_messages([message for _, message in batch])
+    except Exception:
+        sent, failed = [], {}
+        for pks, message in batch:
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                failed.update(dict.fromkeys(pks, str(e)))
+            else:
+                sent.extend(pks)
+        return sent, failed
+    return [pk for pks, _ in batch for pk in pks], {}
+
+def retry_delay(attempt):
+    """
+    How long to wait after failed attempt number ``attempt`` before retrying.
+
+    The delay doubles from TODO_NOTIFICATION_RETRY_SECONDS with every
+    attempt, and a random part of up to half of it spreads the retries of
+    a batch that failed together.
+    """
+    delay = getattr(settings, 'TODO_NOTIFICATION_RETRY_SECONDS', 120) * 2 ** (attempt - 1)
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+def claim_notifications(limit, lease=None, ids=None):
+    """
+    Claim up to ``limit`` due reminders for one dispatcher worker.
+
+    On databases that support it the candidate notification rows are locked
+    with SELECT ... FOR UPDATE SKIP LOCKED so concurrent workers pick different
+    rows; everywhere the claim itself is a conditional UPDATE that only
+    matches unclaimed rows, so a row can never be claimed twice. The claim
+    expires after ``lease`` seconds (TODO_NOTIFICATION_LEASE_SECONDS).
+    ``ids`` limits the candidates to the given reminders.
+
+    Claiming any reminder of a digest user claims all of that user's due
+    reminders, so they go out in one email.
+
+    Returns the claim token, or None when nothing is due.
+    """
+    if lease is None:
+        lease = getattr(settings, 'TODO_NOTIFICATION_LEASE_SECONDS', 300)
+    now = timezone.now()
+    token = uuid.uuid4()
+
+    with transaction.atomic():
+        candidates = TaskNotification.objects.claimable(now).order_by('scheduled_time')
+        if ids is not None:
+            candidates = candidates.filter(pk__in=ids)
+        if db_connection.features.has_select_for_update_skip_locked:
+            # claimable() outer joins the preference, which PostgreSQL refuses
+            # to lock, so only the notification rows are locked
+            of = ('self',) if db_connection.features.has_select_for_update_of else ()
+            candidates = candidates.select_for_update(skip_locked=True, of=of)
+        ids = list(candidates.values_list('pk', flat=True)[:limit])
+        if not ids:
+            return None
+        claimed = TaskNotification.objects.claimable(now).filter(pk__in=ids).update(
+            claim_token=token,
+            claimed_until=now + timedelta(seconds=lease)
+        )
+        if claimed:
+            TaskNotification.objects.claimable(now).filter(
+                user__notification_preference__digest_frequency__in=NotificationPreference.DIGEST_PERIODS,
+                user_id__in=TaskNotification.objects.filter(claim_token=token).values('user_id')
+            ).update(claim_token=token, claimed_until=now + timedelta(seconds=lease))
+    return token if claimed else None
+
+def deliver_notifications(token, connection):
+    """
+    Send the reminders claimed under ``token`` and save their status.
+
+    Each claimed row is read as a compact Reminder tuple rather than model
+    instances. There is at most one pending reminder per task, so every row
+    is emailed; users with a digest_frequency get one email for all of
+    their reminders. Failed sends are scheduled for a retry with
+    retry_delay() and become DEAD after TODO_NOTIFICATION_MAX_ATTEMPTS.
+    Returns the number of notifications handled.
+    """
+    claimed = TaskNotification.objects.filter(claim_token=token)
+    rows = claimed.order_by('scheduled_time').values_list(*REMINDER_FIELDS).iterator()
+
+    messages = []
+    failed = {}
+    task_ids = set()
+    digests = defaultdict(list)
+    attempts = {}
+    for reminder in map(Reminder._make, rows):
+        task_ids.add(reminder.task_id)
+        attempts[reminder.pk] = reminder.attempts + 1
+        if not reminder.email:
+            failed[reminder.pk] = 'User has no email address'
+        elif reminder.digest_frequency in NotificationPreference.DIGEST_PERIODS:
+            digests[reminder.user_id].append(reminder)
+        else:
+            messages.append(([reminder.pk], build_notification_email(reminder, connection)))
+    for reminders in digests.values():
+        messages.append(([reminder.pk for reminder in reminders], build_digest_email(reminders, connection)))
+    sent = []
+    if messages:
+        sent, send_errors = _send_batch(connection, messages)
+        failed.update(send_errors)
+
+    with transaction.atomic():
+        now = timezone.now()
+        if sent:
+            claimed.filter(pk__in=sent).update(
+                status='SENT', sent_at=now, next_attempt_at=None, updated_at=now
+            )
+        digest_users = [
+            user_id for user_id, reminders in digests.items() if reminders[0].pk not in failed
+        ]
+        if digest_users:
+            NotificationPreference.objects.filter(user_id__in=digest_users).update(last_digest_sent_at=now)
+        if failed:
+            # One UPDATE for every failure, each with its own error and retry time
+            max_attempts = getattr(settings, 'TODO_NOTIFICATION_MAX_ATTEMPTS', 5)
+            retries = {pk: now + retry_delay(attempts[pk]) for pk in failed if attempts[pk] < max_attempts}
+            claimed.filter(pk__in=failed).update(
+                updated_at=now,
+                attempts=F('attempts') + 1,
+                status=Case(When(pk__in=retries, then=Value('FAILED')), default=Value('DEAD')),
+                error_message=Case(*[When(pk=pk, then=Value(error)) for pk, error in failed.items()]),
+                next_attempt_at=Case(
+                    *[When(pk=pk, then=Value(at)) for pk, at in retries.items()],
+                    default=None,
+                    output_field=DateTimeField()
+                )
+            )
+        handled = claimed.update(claim_token=None, claimed_until=None)
+
+    # Queryset updates skip the post_save signals that invalidate cached responses
+    invalidate_tasks(task_ids)
+    return handled
+
+def reschedule_user_notifications(pref):
+    """
+    Recompute every pending reminder of a user after a preference change.
+
+    Pending rows, including failed ones waiting for a retry, are moved to
+    the task's due date minus the new timing and reset to PENDING in one
+    UPDATE, open tasks that have neither such a reminder nor a sent one get
+    one through batched inserts, and turning email notifications off
+    cancels them with one UPDATE.
+    """
+    user_id = pref.user_id
+    pending = TaskNotification.objects.filter(user_id=user_id).scheduled()
+    now = timezone.now()
+
+    with transaction.atomic():
+        if not pref.email_notifications:
+            pending.update(
+                status='CANCELLED',
+                next_attempt_at=None,
+                error_message='Email notifications were turned off',
+                updated_at=now
+            )
+        else:
+            # A retry of a task that also has a pending row would collide with it
+            pending.filter(
+                status='FAILED',
+                task_id__in=pending.filter(status='PENDING').values('task_id')
+            ).delete()
+            delta = pref.get_timing_delta()
+            due_date = Subquery(Task.objects.filter(pk=OuterRef('task_id')).values('due_date')[:1])
+            pending.filter(task__due_date__isnull=False).update(
+                scheduled_time=ExpressionWrapper(due_date - Value(delta), output_field=DateTimeField()),
+                status='PENDING',
+                next_attempt_at=None,
+                attempts=0,
+                updated_at=now
+            )
+
+            reminders = TaskNotification.objects.filter(task_id=OuterRef('pk'), user_id=user_id)
+            missing = Task.objects.filter(
+                user_id=user_id,
+                completed=False,
+                due_date__gt=now
+            ).exclude(
+                Exists(reminders.scheduled())
+            ).exclude(
+                Exists(reminders.filter(status='SENT'))
+            ).values_list('pk', 'due_date')
+            rows = (
+                TaskNotification(task_id=task_id, user_id=user_id, scheduled_time=due - delta)
+                for task_id, due in missing.iterator()
+            )
+            batch_size = getattr(settings, 'TODO_NOTIFICATION_BATCH_SIZE', 100)
+            while batch := list(islice(rows, batch_size)):
+                TaskNotification.objects.bulk_create(batch, ignore_conflicts=True)
+
+    # Queryset updates skip the post_save signals that invalidate cached responses
+    invalidate_users([user_id])
+
+def reschedule_for_preference(pref):
+    """
+    Apply a preference change to the user's pending reminders.
+
+    Users with more dated tasks than TODO_RESCHEDULE_INLINE_LIMIT are only
+    flagged, and the notification dispatcher reschedules them. Returns
+    whether the reminders were rescheduled right away.
+    """
+    limit = getattr(settings, 'TODO_RESCHEDULE_INLINE_LIMIT', 1000)
+    if Task.objects.filter(user_id=pref.user_id, due_date__isnull=False).count() > limit:
+        NotificationPreference.objects.filter(pk=pref.pk).update(reschedule_pending=True)
+        return False
+    reschedule_user_notifications(pref)
+    return True
+
+def reschedule_deferred_preferences():
+    """Reschedule the reminders of every flagged preference, returning how many"""
+    done = 0
+    for pk in NotificationPreference.objects.filter(reschedule_pending=True).values_list('pk', flat=True):
+        # Clearing the flag claims the job, so each change runs on one worker
+        if NotificationPreference.objects.filter(pk=pk, reschedule_pending=True).update(reschedule_pending=False):
+            reschedule_user_notifications(NotificationPreference.objects.get(pk=pk))
+            done += 1
+    return done
+
+def open_connection():
+    """
+    Return an open email backend connection.
+
+    If opening fails, sending opens the connection again, so the error is
+    recorded on each notification instead of aborting the run.
+    """
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception:
+        pass
+    return connection
+
+def send_task_notifications(batch_size=None):
+    """
+    Send notifications for tasks that are due soon.
+
+    Due reminders are claimed and emailed in batches of
+    TODO_NOTIFICATION_BATCH_SIZE over a single backend connection
+    until none are left. Claiming makes it safe to run this while other
+    senders or the dispatch_notifications command are running.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'TODO_NOTIFICATION_BATCH_SIZE', 100)
+    reschedule_deferred_preferences()
+
+    connection = None
+    try:
+        while True:
+            token = claim_notifications(batch_size)
+            if token is None:
+                break
+            connection = connection or open_connection()
+            deliver_notifications(token, connection)
+    finally:
+        if connection is not None:
+            connection.close()
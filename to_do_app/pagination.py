@@ -0,0 +1,207 @@
+import base64
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Keyset pagination for task lists.
+
+    The cursor stores the values of every ordering field of the last row on
+    the page (with the primary key appended as a tie-breaker), and the next
+    page is fetched with a seek predicate on that tuple instead of an OFFSET,
+    so every page costs the same no matter how deep the client has paged.
+    Nullable fields such as due_date always sort their nulls last.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.prepare(queryset, request, view)
+        return self.finish(list(self.page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views, fetching the page with the async ORM"""
+        self.prepare(queryset, request, view)
+        # One chunk holds the whole page, so prefetches run once for it
+        rows = self.page_queryset.aiterator(chunk_size=self.page_size + 1)
+        return self.finish([obj async for obj in rows])
+
+    def prepare(self, queryset, request, view=None):
+        """Work out the page to fetch and build the queryset that fetches it"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.opts = queryset.model._meta
+        self.keys = self.get_keys(queryset, request, view)
+        self.cursor = self.decode_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor['reverse'])
+
+        queryset = queryset.order_by(*self.get_order_by(self.reverse))
+        if self.cursor:
+            queryset = queryset.filter(self.get_seek_filter(self.cursor['position'], self.reverse))
+        # Fetch one extra row to find out whether there is another page
+        self.page_queryset = queryset[:self.page_size + 1]
+
+    def finish(self, results):
+        """Trim the fetched rows to a page and remember where the links point"""
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """Use the ordering requested through the view's OrderingFilter, if any"""
+        for filter_cls in getattr(view, 'filter_backends', []):
+            if issubclass(filter_cls, OrderingFilter):
+                ordering = filter_cls().get_ordering(request, queryset, view)
+                if ordering:
+                    return ordering
+        return self.ordering
+
+    def get_keys(self, queryset, request, view):
+        """Return (field name, descending, nullable) for every cursor key"""
+        opts = queryset.model._meta
+        keys = []
+        for name in self.get_ordering(request, queryset, view):
+            descending = name.startswith('-')
+            field_name = name.lstrip('-')
+            if field_name == 'pk':
+                field_name = opts.pk.name
+            if any(key[0] == field_name for key in keys):
+                continue
+            keys.append((field_name, descending, opts.get_field(field_name).null))
+        if not any(key[0] == opts.pk.name for key in keys):
+            keys.append((opts.pk.name, keys[0][1] if keys else False, False))
+        return keys
+
+    def get_order_by(self, reverse):
+        order_by = []
+        for name, descending, nullable in self.keys:
+            if reverse:
+                descending = not descending
+            expression = F(name).desc if descending else F(name).asc
+            if nullable:
+                nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+                order_by.append(expression(**nulls))
+            else:
+                order_by.append(expression())
+        return order_by
+
+    def get_seek_filter(self, position, reverse):
+        """
+        Build the predicate selecting rows strictly after ``position``.
+
+        For keys (a, b, c) this is a > x OR (a = x AND b > y) OR
+        (a = x AND b = y AND c > z), with the comparisons flipped for
+        descending keys and for backwards paging.
+        """
+        seek = Q(pk__in=[])
+        equal = Q()
+        for (name, descending, nullable), value in zip(self.keys, position):
+            if reverse:
+                descending = not descending
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            if value is None:
+                # Nulls sort last, so nothing follows a null going forwards
+                # and every non-null value precedes it going backwards
+                after = Q(**{f'{name}__isnull': False}) if reverse else None
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{lookup: value})
+                if nullable and not reverse:
+                    after |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            if after is not None:
+                seek |= equal & after
+            equal &= same
+        return seek
+
+    def get_position(self, instance):
+        # Pages of values() rows are dicts
+        if isinstance(instance, dict):
+            return [instance[name] for name, descending, nullable in self.keys]
+        return [getattr(instance, name) for name, descending, nullable in self.keys]
+
+    def encode_cursor(self, position, reverse):
+        values = [
+            value.isoformat() if isinstance(value, (date, datetime)) else value
+            for value in position
+        ]
+        payload = json.dumps({'p': values, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values = payload['p']
+            if len(values) != len(self.keys):
+                raise ValueError('Cursor does not match the ordering')
+            position = [
+                None if value is None else self.opts.get_field(name).to_python(value)
+                for (name, descending, nullable), value in zip(self.keys, values)
+            ]
+            return {'position': position, 'reverse': bool(payload.get('r'))}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,76 @@
+import heapq
+from datetime import timedelta
+
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from .models import TaskNotification
+
+# Rows are re-read from slightly before the watermark, so a write whose
+# transaction committed after a later one was read is still picked up
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+class ReminderWheel:
+    """
+    In-memory schedule of the reminders due within the next ``window``.
+
+    The first refresh() loads every pending reminder and due retry up to the
+    window into a heap ordered by due time. Later calls only read rows whose
+    updated_at is past the watermark, plus rows that entered the window as
+    it moved, so an idle dispatcher costs one small indexed query per
+    refresh. Entries are hints: firing one only claims the row if it is
+    still due, so rows moved or cancelled since they were loaded are skipped.
+    """
+
+    def __init__(self, window):
+        self.window = timedelta(seconds=window)
+        self.heap = []
+        self.queued = set()
+        self.horizon = None
+        self.watermark = None
+
+    def refresh(self, now=None):
+        """Load new, changed and newly in-window reminders, returning how many were queued"""
+        now = now or timezone.now()
+        horizon = now + self.window
+        due_by_horizon = (
+            Q(status='PENDING', scheduled_time__lte=horizon) |
+            Q(status='FAILED', next_attempt_at__lte=horizon)
+        )
+        rows = TaskNotification.objects.filter(due_by_horizon)
+        if self.horizon is None:
+            self.watermark = now
+        else:
+            entered = (
+                Q(status='PENDING', scheduled_time__gt=self.horizon) |
+                Q(status='FAILED', next_attempt_at__gt=self.horizon)
+            )
+            changed = Q(updated_at__gte=self.watermark - WATERMARK_OVERLAP)
+            rows = rows.filter(entered | changed)
+        rows = rows.annotate(
+            due_at=Case(When(status='FAILED', then=F('next_attempt_at')), default=F('scheduled_time'))
+        ).values_list('due_at', 'pk', 'updated_at')
+
+        queued = 0
+        for due_at, pk, updated_at in rows.iterator():
+            self.watermark = max(self.watermark, updated_at)
+            if (due_at, pk) not in self.queued:
+                self.queued.add((due_at, pk))
+                heapq.heappush(self.heap, (due_at, pk))
+                queued += 1
+        self.horizon = horizon
+        return queued
+
+    def pop_due(self, now=None):
+        """Remove and return the ids of the reminders due by ``now``"""
+        now = now or timezone.now()
+        ids = []
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            self.queued.discard(entry)
+            ids.append(entry[1])
+        return ids
+
+    def next_due(self):
+        """When the earliest queued reminder is due, or None"""
+        return self.heap[0][0] if self.heap else None
@@ -1,5 +1,13 @@
+from collections import Counter, defaultdict
 from rest_framework import serializers
-from .models import Task, Category, TaskShare, NotificationPreference, TaskNotification, Tag
+from rest_framework.fields import empty
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django.utils import timezone
+from .models import Task, Category, TaskShare, NotificationPreference, TaskNotification, Tag, TaskVisibility
+from .cache import invalidate_tasks
+from .stats import record_new_visibility, record_task_changes, task_stats_key
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 
@@ -86,8 +94,8 @@ class NotificationPreferenceSerializer(serializers.ModelSerializer):
     class Meta:
         model = NotificationPreference
         fields = ['id', 'email_notifications', 'notification_timing', 
-                 'timing_display', 'created_at', 'updated_at']
-        read_only_fields = ['created_at', 'updated_at']
+                 'timing_display', 'digest_frequency', 'last_digest_sent_at', 'created_at', 'updated_at']
+        read_only_fields = ['last_digest_sent_at', 'created_at', 'updated_at']
 
     def validate_notification_timing(self, value):
         """Validate that the notification timing is valid"""
@@ -174,6 +182,62 @@ class TagSerializer(serializers.ModelSerializer):
             validated_data['user'] = request.user
         return super().create(validated_data)
 
+def get_notification_preference(user):
+    """Return the user's notification preference, creating the default one"""
+    try:
+        return user.notification_preference
+    except NotificationPreference.DoesNotExist:
+        return NotificationPreference.objects.create(user=user)
+
+def build_task_notification(task, pref):
+    """Return an unsaved due-date reminder for the task, or None if not wanted"""
+    if not task.due_date or not pref.email_notifications:
+        return None
+    return TaskNotification(
+        task=task,
+        user_id=task.user_id,
+        scheduled_time=task.due_date - pref.get_timing_delta()
+    )
+
+def schedule_task_notifications(tasks, prefs, created=False):
+    """
+    Upsert the pending reminder of each task, given {user_id: preference}.
+
+    A task has at most one pending reminder per recipient (enforced by a
+    partial unique constraint), so rescheduling moves the existing row
+    rather than adding another one. A failed reminder waiting for a retry
+    counts as the pending one and is reset to PENDING when moved. Tasks that
+    no longer want a reminder lose their pending one. ``created`` skips the
+    lookup for new tasks.
+    """
+    wanted = {}
+    for task in tasks:
+        notification = build_task_notification(task, prefs[task.user_id])
+        if notification:
+            wanted[(task.pk, notification.user_id)] = notification
+
+    if not created:
+        pending = TaskNotification.objects.filter(task__in=[task.pk for task in tasks]).scheduled()
+        moved = []
+        now = timezone.now()
+        for notification in pending:
+            new = wanted.pop((notification.task_id, notification.user_id), None)
+            if new is None:
+                continue
+            notification.scheduled_time = new.scheduled_time
+            notification.status = 'PENDING'
+            notification.next_attempt_at = None
+            notification.attempts = 0
+            notification.updated_at = now
+            moved.append(notification)
+        pending.exclude(pk__in=[notification.pk for notification in moved]).delete()
+        TaskNotification.objects.bulk_update(
+            moved, ['scheduled_time', 'status', 'next_attempt_at', 'attempts', 'updated_at']
+        )
+
+    # A reminder inserted concurrently for the same task wins over this one
+    TaskNotification.objects.bulk_create(wanted.values(), ignore_conflicts=True)
+
 class TaskSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
@@ -202,6 +266,102 @@ class TaskSerializer(serializers.ModelSerializer):
                  'notifications', 'tags', 'tag_ids', 'tag_names']
         read_only_fields = ['created_at', 'updated_at', 'user']
 
+    # Nested relations that ?expand= can ask for; with ?fields= or ?expand=
+    # the ones not expanded are rendered as primary keys
+    EXPANDABLE_FIELDS = ['category', 'shares', 'notifications', 'tags']
+    # Large columns left unloaded when a sparse request does not ask for them
+    DEFERRABLE_FIELDS = ['title', 'description']
+
+    @classmethod
+    def read_fields(cls):
+        return [name for name in cls.Meta.fields if name not in ['category_id', 'tag_ids', 'tag_names']]
+
+    @classmethod
+    def sparse_fieldset(cls, request):
+        """
+        Return the (fields, expand) sets asked for with ?fields= and ?expand=,
+        or None for the full representation. Only reads are trimmed, since
+        writes validate the same fields the serializer renders.
+        """
+        params = getattr(request, 'query_params', None)
+        if params is None or request.method not in ('GET', 'HEAD'):
+            return None
+        if 'fields' not in params and 'expand' not in params:
+            return None
+
+        def names(param, allowed):
+            values = {name.strip() for name in params.get(param, '').split(',') if name.strip()}
+            unknown = values - set(allowed)
+            if unknown:
+                raise serializers.ValidationError({
+                    param: f"Unknown fields: {', '.join(sorted(unknown))}. Must be among: {', '.join(allowed)}"
+                })
+            return values
+
+        fields = names('fields', cls.read_fields()) or set(cls.read_fields())
+        expand = names('expand', cls.EXPANDABLE_FIELDS)
+        return fields | expand, expand
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse = self.sparse_fieldset(self.context.get('request'))
+        if sparse is None:
+            return fields
+        wanted, expand = sparse
+        for name in list(fields):
+            if fields[name].write_only:
+                continue
+            if name not in wanted:
+                del fields[name]
+            elif name in self.EXPANDABLE_FIELDS and name not in expand:
+                # Rendering ids needs no nested serializer and, for category,
+                # no join: the pk comes from category_id
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=name != 'category')
+        return fields
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, sparse=None):
+        """
+        Load everything this serializer renders in a fixed number of queries:
+        one for the tasks (with category and owner joined) plus one each for
+        shares, notifications and tags, regardless of how many tasks there are.
+
+        ``sparse`` is a sparse_fieldset() result; relations that are not
+        rendered are then not loaded, those rendered as ids are loaded as
+        ids only, and unrequested large columns are deferred.
+        """
+        if sparse is None:
+            return queryset.select_related('category', 'user').prefetch_related(
+                Prefetch('shares', queryset=TaskShare.objects.select_related('shared_with')),
+                Prefetch('notifications', queryset=TaskNotification.objects.all()),
+                'tags',
+            )
+
+        fields, expand = sparse
+        if 'owner_username' in fields:
+            queryset = queryset.select_related('user')
+        if 'category' in expand:
+            queryset = queryset.select_related('category')
+        expanded = {
+            'shares': TaskShare.objects.select_related('shared_with'),
+            'notifications': TaskNotification.objects.all(),
+            'tags': Tag.objects.all(),
+        }
+        ids_only = {
+            'shares': TaskShare.objects.only('id', 'task_id'),
+            'notifications': TaskNotification.objects.only('id', 'task_id'),
+            'tags': Tag.objects.only('id'),
+        }
+        prefetches = [
+            Prefetch(name, queryset=expanded[name] if name in expand else ids_only[name])
+            for name in ['shares', 'notifications', 'tags']
+            if name in fields
+        ]
+        deferred = [name for name in cls.DEFERRABLE_FIELDS if name not in fields]
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset.prefetch_related(*prefetches)
+
     def _handle_tags(self, task, tag_ids=None, tag_names=None):
         """
         Handle tag assignment for a task
@@ -209,32 +369,25 @@ class TaskSerializer(serializers.ModelSerializer):
         - tag_names: List of tag names to assign (creates new tags if needed)
         """
         user = task.user
-        
+        if not tag_ids and not tag_names:
+            return
+
+        tags = set()
         if tag_ids:
             # Verify all tags exist and belong to the user
-            tags = Tag.objects.filter(id__in=tag_ids, user=user)
-            if len(tags) != len(tag_ids):
+            tags.update(Tag.objects.filter(id__in=tag_ids, user=user).values_list('id', flat=True))
+            if len(tags) != len(set(tag_ids)):
                 raise serializers.ValidationError({
                     'tag_ids': 'One or more tags do not exist or do not belong to you'
                 })
-            task.tags.set(tags)
-        
+
         if tag_names:
-            tags = []
-            for name in tag_names:
-                tag, created = Tag.objects.get_or_create(
-                    name=name,
-                    user=user,
-                    defaults={'color': '#FF0000'}  # Default color for new tags
-                )
-                tags.append(tag)
-            
-            # If tag_ids weren't provided, replace all tags
-            if not tag_ids:
-                task.tags.set(tags)
-            else:
-                # Otherwise, add to existing tags
-                task.tags.add(*tags)
+            # Named tags are created if needed, in one insert for all of them
+            tags.update(tag.id for tag in Tag.objects.resolve_names(user.id, tag_names).values())
+
+        # Both lists together replace the task's tags; set() only touches
+        # the through rows that actually change
+        task.tags.set(tags)
 
     def create(self, validated_data):
         tag_ids = validated_data.pop('tag_ids', None)
@@ -256,7 +409,7 @@ class TaskSerializer(serializers.ModelSerializer):
         
         # Create notification if due date is set
         if task.due_date:
-            self._create_notification(task)
+            self._schedule_notification(task, created=True)
         
         return task
 
@@ -278,44 +431,345 @@ class TaskSerializer(serializers.ModelSerializer):
         # Handle tags
         self._handle_tags(task, tag_ids, tag_names)
         
-        # Update notification if due date changed
+        # Move or drop the pending notification if due date changed
         if task.due_date != old_due_date:
-            TaskNotification.objects.filter(task=task, status='PENDING').delete()
-            if task.due_date:
-                self._create_notification(task)
+            self._schedule_notification(task)
         
         return task
 
-    def _create_notification(self, task):
-        from datetime import timedelta
-        
-        # Get user's notification preference
-        try:
-            pref = task.user.notification_preference
-        except NotificationPreference.DoesNotExist:
-            # Create default preference
-            pref = NotificationPreference.objects.create(user=task.user)
-        
-        if not pref.email_notifications:
-            return
-        
-        # Calculate notification time based on preference
-        timing_map = {
-            '1H': timedelta(hours=1),
-            '3H': timedelta(hours=3),
-            '6H': timedelta(hours=6),
-            '12H': timedelta(hours=12),
-            '24H': timedelta(hours=24),
-            '48H': timedelta(hours=48),
-            '1W': timedelta(weeks=1),
+    def _schedule_notification(self, task, created=False):
+        prefs = {task.user_id: get_notification_preference(task.user)}
+        schedule_task_notifications([task], prefs, created=created)
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Validate and apply a batch of task creates, partial updates and deletes.
+
+    Every item is checked with TaskSerializer's rules and errors are reported
+    per item; only a fully valid batch is written. Writes happen in one
+    transaction with bulk inserts/updates, set-based tag resolution and
+    batched through-table and notification inserts, so the number of
+    queries does not grow with the number of items.
+    """
+    def get_fields(self):
+        # Declared here because a 'create' class attribute would clash with
+        # Serializer.create
+        return {
+            'create': serializers.ListField(child=serializers.DictField(), required=False, default=list),
+            'update': serializers.ListField(child=serializers.DictField(), required=False, default=list),
+            'delete': serializers.ListField(child=serializers.IntegerField(), required=False, default=list),
         }
-        
-        notification_delta = timing_map[pref.notification_timing]
-        scheduled_time = task.due_date - notification_delta
-        
-        # Create notification
-        TaskNotification.objects.create(
-            task=task,
-            user=task.user,
-            scheduled_time=scheduled_time
-        )
\ No newline at end of file
+
+    def validate(self, data):
+        total = len(data['create']) + len(data['update']) + len(data['delete'])
+        max_items = getattr(settings, 'TODO_BULK_MAX_ITEMS', 1000)
+        if not total:
+            raise serializers.ValidationError("At least one create, update or delete is required")
+        if total > max_items:
+            raise serializers.ValidationError(f"A batch can contain at most {max_items} items")
+
+        user = self.context['request'].user
+        # Errors are aligned with the submitted items, as ListSerializer does
+        errors = {kind: [{} for _ in data[kind]] for kind in ['create', 'update', 'delete']}
+
+        # Update items are plain dicts, so their ids are validated here
+        id_field = serializers.IntegerField()
+        update_ids = []
+        for index, item in enumerate(data['update']):
+            try:
+                update_ids.append(id_field.run_validation(item.get('id', empty)))
+            except serializers.ValidationError as exc:
+                update_ids.append(None)
+                errors['update'][index] = {'id': exc.detail}
+        tasks = {
+            task.pk: task
+            for task in Task.objects.visible_to(user).filter(
+                pk__in=[task_id for task_id in update_ids if task_id is not None] + data['delete']
+            )
+        }
+
+        creates = []
+        for index, item in enumerate(data['create']):
+            serializer = TaskSerializer(data=item, context=self.context)
+            if serializer.is_valid():
+                creates.append((index, user.pk, serializer.validated_data))
+            else:
+                errors['create'][index] = serializer.errors
+
+        updates = []
+        for index, (item, task_id) in enumerate(zip(data['update'], update_ids)):
+            if task_id is None:
+                continue
+            task = tasks.get(task_id)
+            if task is None:
+                errors['update'][index] = {'id': 'Task not found'}
+            elif task.permission not in ['OWNER', 'EDIT', 'DELETE']:
+                errors['update'][index] = {'id': "You don't have permission to edit this task"}
+            else:
+                serializer = TaskSerializer(task, data=item, partial=True, context=self.context)
+                if serializer.is_valid():
+                    updates.append((index, task, serializer.validated_data))
+                else:
+                    errors['update'][index] = serializer.errors
+
+        deletes = []
+        for index, task_id in enumerate(data['delete']):
+            task = tasks.get(task_id)
+            if task is None:
+                errors['delete'][index] = {'id': 'Task not found'}
+            elif task.permission not in ['OWNER', 'DELETE']:
+                errors['delete'][index] = {'id': "You don't have permission to delete this task"}
+            else:
+                deletes.append(task)
+
+        # Categories and tags must belong to the task owner, checked for the
+        # whole batch with one query each
+        items = [('create', index, owner_id, vd) for index, owner_id, vd in creates]
+        items += [('update', index, task.user_id, vd) for index, task, vd in updates]
+        category_owners = dict(Category.objects.filter(
+            id__in={vd['category_id'] for _, _, _, vd in items if vd.get('category_id')}
+        ).values_list('id', 'user_id'))
+        tag_owners = dict(Tag.objects.filter(
+            id__in={tag_id for _, _, _, vd in items for tag_id in vd.get('tag_ids') or []}
+        ).values_list('id', 'user_id'))
+        for kind, index, owner_id, vd in items:
+            item_errors = {}
+            if vd.get('category_id') and category_owners.get(vd['category_id']) != owner_id:
+                item_errors['category_id'] = 'Category not found or does not belong to user'
+            if any(tag_owners.get(tag_id) != owner_id for tag_id in vd.get('tag_ids') or []):
+                item_errors['tag_ids'] = 'One or more tags do not exist or do not belong to you'
+            if item_errors:
+                errors[kind][index] = item_errors
+
+        errors = {kind: kind_errors for kind, kind_errors in errors.items() if any(kind_errors)}
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        data['create'] = [vd for _, _, vd in creates]
+        data['update'] = [(task, vd) for _, task, vd in updates]
+        data['delete'] = deletes
+        return data
+
+    def create(self, validated_data):
+        user = self.context['request'].user
+        now = timezone.now()
+        TaskTag = Task.tags.through
+
+        with transaction.atomic():
+            created = []
+            for vd in validated_data['create']:
+                fields = self._task_fields(vd)
+                created.append(Task(user=user, **fields))
+            Task.objects.bulk_create(created)
+            TaskVisibility.objects.bulk_create([
+                TaskVisibility(user_id=task.user_id, task_id=task.pk, permission='OWNER')
+                for task in created
+            ])
+            record_new_visibility((task.user_id, task) for task in created)
+
+            updated = []
+            changed_due_dates = []
+            stats_changes = []
+            update_fields = {'updated_at'}
+            for task, vd in validated_data['update']:
+                fields = self._task_fields(vd)
+                if 'due_date' in fields and fields['due_date'] != task.due_date:
+                    changed_due_dates.append(task)
+                old_key = task_stats_key(task)
+                for attr, value in fields.items():
+                    setattr(task, attr, value)
+                task.updated_at = now
+                update_fields.update(fields)
+                updated.append(task)
+                stats_changes.append((task.pk, old_key, task_stats_key(task)))
+            if updated:
+                Task.objects.bulk_update(updated, sorted(update_fields))
+                record_task_changes(stats_changes)
+
+            # Tags: tag_ids and tag_names together give the task's new tag set
+            pairs = list(zip(created, validated_data['create']))
+            pairs += [(task, vd) for task, (_, vd) in zip(updated, validated_data['update'])]
+            pairs = [(task, vd) for task, vd in pairs if vd.get('tag_ids') or vd.get('tag_names')]
+            names_by_owner = defaultdict(set)
+            for task, vd in pairs:
+                names_by_owner[task.user_id].update(vd.get('tag_names') or [])
+            tags_by_owner = {
+                owner_id: Tag.objects.resolve_names(owner_id, names)
+                for owner_id, names in names_by_owner.items()
+            }
+            wanted = {
+                task.pk: set(vd.get('tag_ids') or []) | {
+                    tags_by_owner[task.user_id][name].pk for name in vd.get('tag_names') or []
+                }
+                for task, vd in pairs
+            }
+            existing = defaultdict(dict)
+            for row_id, task_id, tag_id in TaskTag.objects.filter(
+                task_id__in=[task.pk for task in updated if task.pk in wanted]
+            ).values_list('id', 'task_id', 'tag_id'):
+                existing[task_id][tag_id] = row_id
+            stale = {
+                row_id: tag_id
+                for task_id, tag_ids in wanted.items()
+                for tag_id, row_id in existing[task_id].items()
+                if tag_id not in tag_ids
+            }
+            if stale:
+                TaskTag.objects.filter(id__in=stale).delete()
+            new_rows = [
+                TaskTag(task_id=task_id, tag_id=tag_id)
+                for task_id, tag_ids in wanted.items()
+                for tag_id in tag_ids
+                if tag_id not in existing[task_id]
+            ]
+            TaskTag.objects.bulk_create(new_rows)
+            tag_counts = Counter(row.tag_id for row in new_rows)
+            tag_counts.subtract(stale.values())
+            Tag.objects.add_task_counts(tag_counts)
+
+            # Reminders, using each owner's preference
+            new_due_dates = [task for task in created if task.due_date]
+            prefs = self._notification_preferences({task.user_id for task in new_due_dates + changed_due_dates})
+            schedule_task_notifications(new_due_dates, prefs, created=True)
+            if changed_due_dates:
+                schedule_task_notifications(changed_due_dates, prefs)
+
+            deleted = [task.pk for task in validated_data['delete']]
+            if deleted:
+                Task.objects.filter(pk__in=deleted).delete()
+
+            # Bulk writes skip model signals, so invalidate cached responses here
+            invalidate_tasks([task.pk for task in created + updated], [user.pk])
+
+        return {'created': created, 'updated': updated, 'deleted': deleted}
+
+    @staticmethod
+    def _task_fields(validated_data):
+        """Return the model field values of a validated TaskSerializer item"""
+        fields = {
+            key: value for key, value in validated_data.items()
+            if key not in ['tag_ids', 'tag_names', 'category_id']
+        }
+        if validated_data.get('category_id'):
+            fields['category_id'] = validated_data['category_id']
+        return fields
+
+    @staticmethod
+    def _notification_preferences(user_ids):
+        """Return {user_id: preference}, creating default preferences in bulk"""
+        prefs = {
+            pref.user_id: pref
+            for pref in NotificationPreference.objects.filter(user_id__in=user_ids)
+        }
+        missing = [NotificationPreference(user_id=user_id) for user_id in user_ids - prefs.keys()]
+        if missing:
+            NotificationPreference.objects.bulk_create(missing, ignore_conflicts=True)
+            prefs.update({
+                pref.user_id: pref
+                for pref in NotificationPreference.objects.filter(user_id__in=user_ids - prefs.keys())
+            })
+        return prefs
+
+class TagSetSerializer(serializers.Serializer):
+    tag_ids = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    tag_names = serializers.ListField(child=serializers.CharField(max_length=50), required=False, default=list)
+
+class TaskTagBatchSerializer(serializers.Serializer):
+    """
+    Add, remove or replace tags across many of the user's tasks.
+
+    The tasks are given as task_ids or, when those are omitted, passed to
+    save() as a queryset built from the request filters. Either way the
+    tasks are read once, up to TODO_BULK_MAX_ITEMS, and the Task.tags
+    through table is written with a handful of set-based statements.
+    """
+    task_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    add = TagSetSerializer(required=False)
+    remove = TagSetSerializer(required=False)
+    replace = TagSetSerializer(required=False)
+
+    def validate(self, data):
+        user = self.context['request'].user
+        if not any(key in data for key in ['add', 'remove', 'replace']):
+            raise serializers.ValidationError("One of add, remove or replace is required")
+        if 'replace' in data and ('add' in data or 'remove' in data):
+            raise serializers.ValidationError("replace cannot be combined with add or remove")
+
+        if 'task_ids' in data:
+            task_ids = set(data['task_ids'])
+            max_items = getattr(settings, 'TODO_BULK_MAX_ITEMS', 1000)
+            if not task_ids:
+                raise serializers.ValidationError({'task_ids': 'At least one task is required'})
+            if len(task_ids) > max_items:
+                raise serializers.ValidationError({'task_ids': f'A batch can contain at most {max_items} tasks'})
+            owned = Task.objects.filter(user=user, pk__in=task_ids)
+            if owned.count() != len(task_ids):
+                raise serializers.ValidationError({
+                    'task_ids': 'One or more tasks do not exist or do not belong to you'
+                })
+
+        tag_ids = {tag_id for key in ['add', 'replace'] for tag_id in data.get(key, {}).get('tag_ids', [])}
+        if tag_ids and Tag.objects.filter(id__in=tag_ids, user=user).count() != len(tag_ids):
+            raise serializers.ValidationError({
+                'tag_ids': 'One or more tags do not exist or do not belong to you'
+            })
+        return data
+
+    def create(self, validated_data):
+        user = self.context['request'].user
+        TaskTag = Task.tags.through
+        if 'task_ids' in validated_data:
+            tasks = Task.objects.filter(user=user, pk__in=validated_data['task_ids'])
+        else:
+            tasks = validated_data['tasks'].filter(user=user)
+
+        with transaction.atomic():
+            # Read the tasks once, before any write: a filter on the tags
+            # being changed would match different tasks afterwards
+            max_items = getattr(settings, 'TODO_BULK_MAX_ITEMS', 1000)
+            task_ids = list(tasks.order_by().values_list('pk', flat=True).distinct()[:max_items + 1])
+            if len(task_ids) > max_items:
+                raise serializers.ValidationError(f"A batch can contain at most {max_items} tasks")
+
+            # add and replace both name the tags the tasks should end up with
+            tag_set = validated_data.get('replace', validated_data.get('add'))
+            wanted = set()
+            if tag_set:
+                tags = Tag.objects.resolve_names(user.pk, tag_set['tag_names'])
+                wanted = set(tag_set['tag_ids']) | {tag.pk for tag in tags.values()}
+
+            added = removed = 0
+            stale = None
+            if 'replace' in validated_data:
+                stale = TaskTag.objects.filter(task_id__in=task_ids).exclude(tag_id__in=wanted)
+            if 'remove' in validated_data:
+                unwanted = Tag.objects.filter(user=user).filter(
+                    Q(id__in=validated_data['remove']['tag_ids']) |
+                    Q(name__in=validated_data['remove']['tag_names'])
+                ).values('pk')
+                stale = TaskTag.objects.filter(task_id__in=task_ids, tag_id__in=unwanted)
+            tag_counts = Counter()
+            if stale is not None:
+                tag_counts.subtract(dict(stale.values('tag_id').annotate(n=Count('pk')).values_list('tag_id', 'n')))
+                removed = stale.delete()[0]
+
+            if wanted:
+                existing = set(TaskTag.objects.filter(
+                    task_id__in=task_ids,
+                    tag_id__in=wanted
+                ).values_list('task_id', 'tag_id'))
+                new_rows = [
+                    TaskTag(task_id=task_id, tag_id=tag_id)
+                    for task_id in task_ids
+                    for tag_id in wanted
+                    if (task_id, tag_id) not in existing
+                ]
+                TaskTag.objects.bulk_create(new_rows, ignore_conflicts=True)
+                added = len(new_rows)
+                tag_counts.update(row.tag_id for row in new_rows)
+            Tag.objects.add_task_counts(tag_counts)
+
+            # Through-table writes skip m2m_changed, so invalidate cached responses here
+            invalidate_tasks(task_ids, [user.pk])
+
+        return {'tasks': len(task_ids), 'added': added, 'removed': removed}
@@ -0,0 +1,188 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from .cache import invalidate_users, invalidate_tasks, task_viewer_ids
+from .models import Task, TaskQuerySet, Tag, Category, TaskShare, TaskNotification, TaskVisibility
+from .stats import (
+    apply_deltas, move_category_to_none, record_task_changes, stats_key, task_stats_key
+)
+
+@receiver(post_save, sender=Task)
+def add_owner_visibility(sender, instance, created, raw=False, **kwargs):
+    """Give the owner of a new task a visibility row"""
+    if created and not raw:
+        TaskVisibility.objects.get_or_create(
+            user_id=instance.user_id,
+            task=instance,
+            defaults={'permission': 'OWNER'}
+        )
+
+@receiver(post_save, sender=TaskShare)
+def sync_share_visibility(sender, instance, raw=False, **kwargs):
+    """Mirror a share (and its current permission) into the visibility table"""
+    if not raw:
+        TaskVisibility.objects.update_or_create(
+            user_id=instance.shared_with_id,
+            task_id=instance.task_id,
+            defaults={'permission': instance.permission}
+        )
+
+@receiver(post_delete, sender=TaskShare)
+def remove_share_visibility(sender, instance, origin=None, **kwargs):
+    """Drop the visibility row of a removed share"""
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin is not None and origin_model is not TaskShare:
+        # The task or user delete that cascaded here removes the visibility
+        # row itself, and uncounts it once for its whole delete
+        return
+    deleted, _ = TaskVisibility.objects.filter(
+        user_id=instance.shared_with_id,
+        task_id=instance.task_id
+    ).exclude(permission='OWNER').delete()
+    if deleted:
+        task = Task.objects.filter(pk=instance.task_id).values_list('category_id', 'priority', 'completed').first()
+        apply_deltas({(instance.shared_with_id, *stats_key(*task)): -1})
+
+# Per-user task statistics. Every visibility row counts its task once for
+# its user, so owners and share recipients are both covered by counting
+# visibility rows in and out, and task edits move the task between groups
+# for all of its viewers. Rows go out with their share or their task; there
+# is no per-row delete receiver, so cascades can still fast delete them.
+
+STATS_FIELDS = {'category', 'category_id', 'priority', 'completed'}
+
+@receiver(pre_save, sender=Task)
+def remember_stats_key(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Read the group a task is counted in before an update changes it"""
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not STATS_FIELDS & set(update_fields):
+        return
+    old = Task.objects.filter(pk=instance.pk).values_list('category_id', 'priority', 'completed').first()
+    instance._stats_key = stats_key(*old) if old else None
+
+@receiver(post_save, sender=Task)
+def update_task_stats(sender, instance, created, raw=False, **kwargs):
+    old = getattr(instance, '_stats_key', None)
+    if created or raw or old is None:
+        return
+    del instance._stats_key
+    record_task_changes([(instance.pk, old, task_stats_key(instance))])
+
+@receiver(post_save, sender=TaskVisibility)
+def count_visible_task(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        apply_deltas({(instance.user_id, *task_stats_key(instance.task)): 1})
+
+@receiver(pre_delete, sender=Task)
+def uncount_deleted_task(sender, instance, origin=None, **kwargs):
+    """Uncount a task from the statistics and Tag.task_count before cascades remove its rows"""
+    if isinstance(origin, TaskQuerySet):
+        # TaskQuerySet.delete() uncounted the whole queryset already
+        return
+    Task.objects.filter(pk=instance.pk).uncount()
+
+@receiver(post_delete, sender=Category)
+def uncategorize_task_stats(sender, instance, **kwargs):
+    """SET_NULL moved the category's tasks with a queryset update, which sends no signals"""
+    move_category_to_none(instance.pk)
+
+# Tag.task_count. Through-table rows are only written by Task.tags, whose
+# m2m_changed covers both sides of the relation, and by task deletion, which
+# removes them with a fast delete and is uncounted by TaskQuerySet.uncount().
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def count_tagged_tasks(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        # pk_set may name rows that do not exist, so read the ones that do
+        rows = sender.objects.filter(**{'tag_id' if reverse else 'task_id': instance.pk})
+        if action == 'pre_remove':
+            rows = rows.filter(**{'task_id__in' if reverse else 'tag_id__in': pk_set})
+        instance._removed_tag_ids = list(rows.values_list('tag_id', flat=True))
+    elif action in ('post_remove', 'post_clear'):
+        removed = Counter(getattr(instance, '_removed_tag_ids', []))
+        Tag.objects.add_task_counts({tag_id: -n for tag_id, n in removed.items()})
+    elif action == 'post_add':
+        # pk_set only holds the rows that were actually added
+        if reverse:
+            Tag.objects.add_task_counts({instance.pk: len(pk_set)})
+        else:
+            Tag.objects.add_task_counts({tag_id: 1 for tag_id in pk_set})
+
+# Response cache invalidation. Each change bumps the cache generation of
+# everyone whose task, tag or category responses could include the changed
+# row: task owners, share recipients and tag/category owners.
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_new_user(sender, instance, created, raw=False, **kwargs):
+    """Start new users on a fresh generation in case their id was reused"""
+    if created and not raw:
+        invalidate_users([instance.pk])
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=TaskShare)
+@receiver(post_save, sender=TaskNotification)
+def invalidate_task_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if sender is Task:
+        invalidate_tasks([instance.pk], [instance.user_id])
+    elif sender is TaskShare:
+        invalidate_tasks([instance.task_id], [instance.shared_with_id])
+    else:
+        invalidate_tasks([instance.task_id], [instance.user_id])
+
+@receiver(pre_delete, sender=Task)
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Category)
+def collect_viewers_before_delete(sender, instance, origin=None, **kwargs):
+    """Remember who could see the row before cascades remove the visibility rows"""
+    if isinstance(origin, TaskQuerySet):
+        # TaskQuerySet.delete() invalidates the whole queryset at once
+        return
+    if sender is Task:
+        task_ids = [instance.pk]
+    else:
+        task_ids = instance.tasks.values_list('id', flat=True)
+    instance._cache_viewer_ids = task_viewer_ids(task_ids) | {instance.user_id}
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Category)
+def invalidate_after_delete(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, TaskQuerySet):
+        invalidate_users(getattr(instance, '_cache_viewer_ids', {instance.user_id}))
+
+@receiver(post_delete, sender=TaskShare)
+@receiver(post_delete, sender=TaskNotification)
+def invalidate_task_child_delete(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, TaskQuerySet):
+        return
+    if sender is TaskShare:
+        invalidate_tasks([instance.task_id], [instance.shared_with_id])
+    elif not (isinstance(origin, QuerySet) and origin.model is TaskNotification):
+        # Queryset deletes of reminders are bulk writes, which invalidate
+        # their tasks once themselves
+        invalidate_tasks([instance.task_id], [instance.user_id])
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Category)
+def invalidate_tag_or_category_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_tasks(instance.tasks.values_list('id', flat=True), [instance.user_id])
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def invalidate_task_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate on Task.tags changes made from either side of the relation"""
+    if reverse and action == 'pre_clear':
+        instance._cache_cleared_task_ids = list(instance.tasks.values_list('id', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        task_ids = pk_set or getattr(instance, '_cache_cleared_task_ids', [])
+    else:
+        task_ids = [instance.pk]
+    invalidate_tasks(task_ids, [instance.user_id])
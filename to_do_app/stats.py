@@ -0,0 +1,166 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Task, Category, TaskVisibility, UserTaskStats
+
+def stats_key(category_id, priority, completed):
+    """The UserTaskStats group of a task with these values"""
+    return (category_id or UserTaskStats.NO_CATEGORY, priority, completed)
+
+def task_stats_key(task):
+    return stats_key(task.category_id, task.priority, task.completed)
+
+def apply_deltas(deltas):
+    """
+    Add {(user_id, category_id, priority, completed): delta} to the counters.
+
+    Missing groups are created for positive deltas only, so a decrement
+    racing the deletion of its user never inserts a row for them. Each
+    group costs one UPDATE whatever the delta, so bulk writes cost one per
+    group they touch rather than one per task.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    UserTaskStats.objects.bulk_create([
+        UserTaskStats(user_id=user_id, category_id=category_id, priority=priority, completed=completed)
+        for (user_id, category_id, priority, completed), delta in deltas.items()
+        if delta > 0
+    ], ignore_conflicts=True)
+    for (user_id, category_id, priority, completed), delta in deltas.items():
+        UserTaskStats.objects.filter(
+            user_id=user_id, category_id=category_id, priority=priority, completed=completed
+        ).update(count=F('count') + delta)
+
+def record_new_visibility(rows):
+    """Count new (user_id, task) visibility rows, for writes that bypass post_save"""
+    apply_deltas(Counter((user_id, *task_stats_key(task)) for user_id, task in rows))
+
+def record_task_changes(changes):
+    """
+    Move changed tasks between groups for everyone who can see them.
+
+    ``changes`` is a list of (task_id, old key, new key); unchanged tasks
+    are skipped without a query.
+    """
+    changes = {task_id: (old, new) for task_id, old, new in changes if old != new}
+    if not changes:
+        return
+    deltas = Counter()
+    viewers = TaskVisibility.objects.filter(task_id__in=changes).values_list('task_id', 'user_id')
+    for task_id, user_id in viewers:
+        old, new = changes[task_id]
+        deltas[(user_id, *old)] -= 1
+        deltas[(user_id, *new)] += 1
+    apply_deltas(deltas)
+
+def move_category_to_none(category_id):
+    """
+    Move the counts of a deleted category to NO_CATEGORY, as SET_NULL did to
+    its tasks. Rows are merged or relabelled rather than inserted, since the
+    category may be going away with its user.
+    """
+    with transaction.atomic():
+        for row in UserTaskStats.objects.filter(category_id=category_id):
+            merged = UserTaskStats.objects.filter(
+                user_id=row.user_id, category_id=UserTaskStats.NO_CATEGORY,
+                priority=row.priority, completed=row.completed
+            ).update(count=F('count') + row.count)
+            if merged:
+                row.delete()
+            else:
+                row.category_id = UserTaskStats.NO_CATEGORY
+                row.save(update_fields=['category_id'])
+
+def group_visibility(visibility):
+    """Count visibility rows per group, as {(user_id, category_id, priority, completed): count}"""
+    groups = visibility.values(
+        'user_id', 'task__category_id', 'task__priority', 'task__completed'
+    ).annotate(n=Count('id')).order_by()
+    return {
+        (group['user_id'], *stats_key(group['task__category_id'], group['task__priority'], group['task__completed'])): group['n']
+        for group in groups
+    }
+
+def record_deleted_tasks(task_ids):
+    """Uncount tasks that are about to be deleted, with one grouped query for all of them"""
+    groups = group_visibility(TaskVisibility.objects.filter(task_id__in=task_ids))
+    apply_deltas({key: -count for key, count in groups.items()})
+
+def count_groups(user_ids=None):
+    """Count every group from scratch"""
+    visibility = TaskVisibility.objects.all()
+    if user_ids is not None:
+        visibility = visibility.filter(user_id__in=user_ids)
+    return group_visibility(visibility)
+
+def stored_groups(user_ids=None):
+    rows = UserTaskStats.objects.exclude(count=0)
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+    return {
+        (row['user_id'], row['category_id'], row['priority'], row['completed']): row['count']
+        for row in rows.values('user_id', 'category_id', 'priority', 'completed', 'count')
+    }
+
+def find_drift(user_ids=None):
+    """Return {key: (stored, actual)} for every group whose counter is wrong"""
+    stored = stored_groups(user_ids)
+    actual = count_groups(user_ids)
+    return {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in stored.keys() | actual.keys()
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+def rebuild(user_ids=None):
+    """Replace the counters with a full recount, returning the number of groups"""
+    groups = count_groups(user_ids)
+    with transaction.atomic():
+        rows = UserTaskStats.objects.all()
+        if user_ids is not None:
+            rows = rows.filter(user_id__in=user_ids)
+        rows.delete()
+        UserTaskStats.objects.bulk_create([
+            UserTaskStats(user_id=user_id, category_id=category_id, priority=priority, completed=completed, count=count)
+            for (user_id, category_id, priority, completed), count in groups.items()
+        ], batch_size=1000)
+    return len(groups)
+
+def get_task_stats(user):
+    """
+    Summarize the tasks a user can see from their counters.
+
+    Overdue depends on the clock rather than on writes, so it is the one
+    figure counted live, with an indexed query.
+    """
+    rows = list(UserTaskStats.objects.filter(user=user).exclude(count=0))
+    by_priority = {priority: 0 for priority, _ in Task.PRIORITY_CHOICES}
+    by_category = Counter()
+    total = completed = 0
+    for row in rows:
+        total += row.count
+        completed += row.count if row.completed else 0
+        by_priority[row.priority] += row.count
+        by_category[row.category_id] += row.count
+
+    names = dict(Category.objects.filter(id__in=by_category).values_list('id', 'name'))
+    overdue = Task.objects.visible_to(user).filter(completed=False, due_date__lt=timezone.now()).count()
+    return {
+        'total': total,
+        'completed': completed,
+        'pending': total - completed,
+        'overdue': overdue,
+        'by_priority': by_priority,
+        'by_category': [
+            {
+                'category': category_id or None,
+                'name': names.get(category_id),
+                'count': count,
+            }
+            for category_id, count in sorted(by_category.items())
+        ],
+    }
@@ -0,0 +1,129 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from django.utils import timezone
+from ..models import Task, Category, Tag, TaskShare, TaskNotification
+
+class AsyncViewTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.tags = [Tag.objects.create(name=f'Tag {i}', user=self.user) for i in range(3)]
+        for i in range(5):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                user=self.user,
+                category=self.category,
+                priority='HIGH' if i % 2 else 'LOW',
+                due_date=timezone.now() + timezone.timedelta(days=1)
+            )
+            task.tags.add(*self.tags[:i % 3 + 1])
+            TaskShare.objects.create(task=task, shared_with=self.other_user)
+            TaskNotification.objects.create(
+                task=task,
+                user=self.user,
+                scheduled_time=timezone.now() + timezone.timedelta(hours=1)
+            )
+        self.task = task
+        shared = Task.objects.create(title='Shared with me', user=self.other_user)
+        TaskShare.objects.create(task=shared, shared_with=self.user)
+
+    def assertSameResponse(self, sync_url, async_url, params=None):
+        sync_response = self.client.get(sync_url, params or {})
+        async_response = self.client.get(async_url, params or {})
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.json(), sync_response.json())
+        return async_response
+
+    def test_matches_the_sync_endpoints(self):
+        """Every async endpoint returns what its sync counterpart does"""
+        cases = [
+            ('task-list', 'async-task-list', {}),
+            ('task-detail', 'async-task-detail', {'pk': self.task.pk}),
+            ('task-upcoming-notifications', 'async-task-upcoming-notifications', {}),
+            ('tag-list', 'async-tag-list', {}),
+            ('tag-popular', 'async-tag-popular', {}),
+            ('category-list', 'async-category-list', {}),
+        ]
+        for sync_name, async_name, kwargs in cases:
+            with self.subTest(async_name):
+                self.assertSameResponse(reverse(sync_name, kwargs=kwargs), reverse(async_name, kwargs=kwargs))
+
+    def test_task_list_filters_and_pages(self):
+        """Filters, search and cursors behave as in the sync list"""
+        for params in [{'priority': 'HIGH'}, {'search': 'Task 1'}, {'tags': self.tags[2].id}, {'ordering': 'title'}]:
+            with self.subTest(params):
+                self.assertSameResponse(reverse('task-list'), reverse('async-task-list'), params)
+
+        response = self.client.get(reverse('async-task-list'), {'page_size': 4})
+        self.assertEqual(len(response.json()['results']), 4)
+        next_page = self.client.get(response.json()['next'])
+        self.assertEqual(len(next_page.json()['results']), 2)
+
+        response = self.client.get(reverse('async-task-list'), {'priority': 'NOPE'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sparse_fieldsets(self):
+        """?fields= and ?expand= trim the async responses like the sync ones"""
+        cases = [
+            ('task-list', 'async-task-list', {}),
+            ('task-detail', 'async-task-detail', {'pk': self.task.pk}),
+        ]
+        for sync_name, async_name, kwargs in cases:
+            for params in [{'fields': 'id'}, {'fields': 'id,title,tags'}, {'fields': 'id', 'expand': 'category,tags'}]:
+                with self.subTest(async_name, **params):
+                    self.assertSameResponse(reverse(sync_name, kwargs=kwargs), reverse(async_name, kwargs=kwargs), params)
+
+        response = self.client.get(reverse('async-task-list'), {'fields': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_authentication(self):
+        """Requests need a valid access token"""
+        client = APIClient()
+        response = client.get(reverse('async-task-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = client.get(reverse('async-task-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invisible_task_is_not_found(self):
+        """Tasks the user cannot see are a 404"""
+        hidden = Task.objects.create(title='Hidden', user=self.other_user)
+        response = self.client.get(reverse('async-task-detail', kwargs={'pk': hidden.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_conditional_get(self):
+        """The async task list answers If-None-Match like the sync one"""
+        response = self.client.get(reverse('async-task-list'))
+        response = self.client.get(reverse('async-task-list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_upcoming_notifications_conditional_get(self):
+        """Upcoming notifications answer If-None-Match like the sync endpoint"""
+        url = reverse('async-task-upcoming-notifications')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A reminder falling due changes the set, and so the ETag
+        TaskNotification.objects.filter(pk=TaskNotification.objects.first().pk).update(
+            scheduled_time=timezone.now() - timezone.timedelta(minutes=1)
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 4)
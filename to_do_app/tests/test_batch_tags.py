@@ -0,0 +1,108 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..cache import get_cache
+from ..models import Task, Tag
+
+class TaskTagBatchTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.work = Tag.objects.create(name='Work', user=self.user)
+        self.home = Tag.objects.create(name='Home', user=self.user)
+        self.tasks = [
+            Task.objects.create(title=f'Task {i}', user=self.user, priority='HIGH' if i < 2 else 'LOW')
+            for i in range(4)
+        ]
+        for task in self.tasks:
+            task.tags.add(self.home)
+        self.url = reverse('task-batch-tags')
+
+    def _tags(self, task):
+        return sorted(task.tag_list())
+
+    def test_add_and_remove_by_ids(self):
+        """Tags are added and removed across the listed tasks"""
+        ids = [task.id for task in self.tasks[:3]]
+        response = self.client.post(self.url, {
+            'task_ids': ids,
+            'add': {'tag_ids': [self.work.id], 'tag_names': ['New']},
+            'remove': {'tag_names': ['Home']},
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'tasks': 3, 'added': 6, 'removed': 3})
+        for task in self.tasks[:3]:
+            self.assertEqual(self._tags(task), ['New', 'Work'])
+        self.assertEqual(self._tags(self.tasks[3]), ['Home'])
+
+        # Adding tags a task already has is a no-op
+        response = self.client.post(self.url, {'task_ids': ids, 'add': {'tag_ids': [self.work.id]}}, format='json')
+        self.assertEqual(response.data['added'], 0)
+
+    def test_replace_by_filter(self):
+        """Filters from the query string select the tasks to re-tag"""
+        url = f'{self.url}?priority=HIGH'
+        with self.assertNumQueries(11):
+            response = self.client.post(url, {'replace': {'tag_ids': [self.work.id]}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'tasks': 2, 'added': 2, 'removed': 2})
+        self.assertEqual([self._tags(task) for task in self.tasks], [['Work'], ['Work'], ['Home'], ['Home']])
+
+    def test_filter_by_the_changed_tag(self):
+        """A filter on the tag being replaced still selects the tasks it matched"""
+        for task in self.tasks[:3]:
+            task.tags.add(self.work)
+        fresh = Tag.objects.create(name='Fresh', user=self.user)
+        response = self.client.post(f'{self.url}?tags={self.work.id}', {'replace': {'tag_ids': [fresh.id]}}, format='json')
+        self.assertEqual(response.data, {'tasks': 3, 'added': 3, 'removed': 6})
+        self.assertEqual([self._tags(task) for task in self.tasks], [['Fresh']] * 3 + [['Home']])
+
+        response = self.client.post(f'{self.url}?tags={fresh.id}', {
+            'remove': {'tag_ids': [fresh.id]},
+            'add': {'tag_ids': [self.work.id]},
+        }, format='json')
+        self.assertEqual(response.data, {'tasks': 3, 'added': 3, 'removed': 3})
+        self.assertEqual([self._tags(task) for task in self.tasks], [['Work']] * 3 + [['Home']])
+
+        with self.settings(TODO_BULK_MAX_ITEMS=2):
+            response = self.client.post(f'{self.url}?tags={self.work.id}', {'add': {'tag_ids': [fresh.id]}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([self._tags(task) for task in self.tasks], [['Work']] * 3 + [['Home']])
+
+    def test_invalid_batches(self):
+        """Other users' tasks and tags, and unfiltered requests, are rejected"""
+        theirs = Task.objects.create(title='Theirs', user=self.other_user)
+        their_tag = Tag.objects.create(name='Theirs', user=self.other_user)
+        payloads = [
+            {'task_ids': [self.tasks[0].id, theirs.id], 'add': {'tag_ids': [self.work.id]}},
+            {'task_ids': [self.tasks[0].id], 'add': {'tag_ids': [their_tag.id]}},
+            {'task_ids': [self.tasks[0].id]},
+            {'task_ids': [self.tasks[0].id], 'add': {'tag_ids': []}, 'replace': {'tag_ids': []}},
+            {'add': {'tag_ids': [self.work.id]}},
+        ]
+        for payload in payloads:
+            response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+        self.assertEqual(self._tags(theirs), [])
+
+    def test_invalidates_cached_lists(self):
+        """Cached task lists see the new tags"""
+        list_url = reverse('task-list')
+        self.client.get(list_url)
+        self.client.post(self.url, {'task_ids': [self.tasks[0].id], 'add': {'tag_names': ['Fresh']}}, format='json')
+        response = self.client.get(list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
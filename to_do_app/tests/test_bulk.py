@@ -0,0 +1,167 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from ..models import Task, Category, Tag, TaskShare, TaskNotification, TaskVisibility, NotificationPreference
+from ..stats import find_drift
+
+class TaskBulkTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.tag = Tag.objects.create(name='Existing', user=self.user)
+        self.url = reverse('task-bulk')
+
+    def _create_payload(self, count):
+        due_date = (timezone.now() + timezone.timedelta(days=2)).isoformat()
+        return {'create': [
+            {
+                'title': f'Imported {i}',
+                'priority': 'HIGH',
+                'due_date': due_date,
+                'category_id': self.category.id,
+                'tag_ids': [self.tag.id],
+                'tag_names': ['Imported', f'Batch {i % 2}'],
+            }
+            for i in range(count)
+        ]}
+
+    def test_bulk_create(self):
+        """Creates write tasks, tags, visibility rows and reminders"""
+        response = self.client.post(self.url, self._create_payload(3), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([task['title'] for task in response.data['created']], ['Imported 0', 'Imported 1', 'Imported 2'])
+
+        task = Task.objects.get(title='Imported 1')
+        self.assertEqual(task.user, self.user)
+        self.assertEqual(task.category, self.category)
+        self.assertEqual(sorted(task.tag_list()), ['Batch 1', 'Existing', 'Imported'])
+        self.assertTrue(TaskVisibility.objects.filter(task=task, user=self.user, permission='OWNER').exists())
+        notification = TaskNotification.objects.get(task=task)
+        self.assertEqual(notification.scheduled_time, task.due_date - timezone.timedelta(hours=24))
+
+        # The new tasks are visible through the normal endpoints
+        response = self.client.get(reverse('task-list'))
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_bulk_create_query_count(self):
+        """The number of queries does not depend on the number of tasks"""
+        def count(size):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, self._create_payload(size), format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        # The first batch of a user also creates their notification preference
+        NotificationPreference.objects.create(user=self.user)
+        small = count(2)
+        Tag.objects.filter(name__startswith='Batch').delete()
+        self.assertEqual(count(40), small)
+
+    def test_bulk_update_and_delete(self):
+        """Updates and deletes are applied together"""
+        keep = Task.objects.create(title='Keep', user=self.user)
+        keep.tags.add(self.tag)
+        remove = Task.objects.create(title='Remove', user=self.user)
+        due_date = timezone.now() + timezone.timedelta(days=3)
+        payload = {
+            'update': [
+                {'id': keep.id, 'completed': True, 'due_date': due_date.isoformat(), 'tag_names': ['Fresh']},
+            ],
+            'delete': [remove.id],
+        }
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted'], [remove.id])
+        self.assertTrue(response.data['updated'][0]['completed'])
+
+        keep.refresh_from_db()
+        self.assertTrue(keep.completed)
+        self.assertEqual(keep.title, 'Keep')
+        self.assertEqual(keep.tag_list(), ['Fresh'])
+        self.assertEqual(TaskNotification.objects.filter(task=keep, status='PENDING').count(), 1)
+        self.assertFalse(Task.objects.filter(id=remove.id).exists())
+
+    def test_per_item_errors_roll_back(self):
+        """Any invalid item rejects the whole batch with errors per item"""
+        shared = Task.objects.create(title='Shared', user=self.other_user)
+        TaskShare.objects.create(task=shared, shared_with=self.user, permission='VIEW')
+        other_category = Category.objects.create(name='Theirs', user=self.other_user)
+        payload = {
+            'create': [
+                {'title': 'Valid'},
+                {'title': ''},
+                {'title': 'Bad category', 'category_id': other_category.id},
+            ],
+            'update': [{'id': shared.id, 'title': 'Not allowed'}, {'id': 9999, 'title': 'Missing'}],
+            'delete': [shared.id],
+        }
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data
+        self.assertEqual(errors['create'][0], {})
+        self.assertIn('title', errors['create'][1])
+        self.assertIn('category_id', errors['create'][2])
+        self.assertIn('id', errors['update'][0])
+        self.assertIn('id', errors['update'][1])
+        self.assertIn('id', errors['delete'][0])
+        self.assertFalse(Task.objects.filter(title='Valid').exists())
+
+    def test_malformed_update_ids(self):
+        """Update ids that are not integers are per-item errors, not server errors"""
+        task = Task.objects.create(title='Mine', user=self.user)
+        payload = {'update': [
+            {'id': [task.id], 'title': 'List'},
+            {'id': {'pk': task.id}, 'title': 'Dict'},
+            {'title': 'Missing'},
+            {'id': task.id, 'title': 'Valid'},
+        ]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data['update']
+        for index in range(3):
+            self.assertIn('id', errors[index])
+        self.assertEqual(errors[3], {})
+        task.refresh_from_db()
+        self.assertEqual(task.title, 'Mine')
+
+    def test_empty_and_oversized_batches(self):
+        """A batch needs at least one item and respects the size limit"""
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with self.settings(TODO_BULK_MAX_ITEMS=2):
+            response = self.client.post(self.url, self._create_payload(3), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete_query_count(self):
+        """Deletes uncount statistics and tags and invalidate caches once per batch, not once per task"""
+        def count(n):
+            tasks = [Task.objects.create(title=f'Doomed {i}', user=self.user, category=self.category) for i in range(n)]
+            for task in tasks:
+                task.tags.add(self.tag)
+                TaskShare.objects.create(task=task, shared_with=self.other_user)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, {'delete': [task.id for task in tasks]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.assertEqual(count(12), count(2))
+        self.assertEqual(find_drift(), {})
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.task_count, 0)
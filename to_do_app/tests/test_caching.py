@@ -0,0 +1,196 @@
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..cache import get_cache, get_cache_stats
+from ..models import Task, Category, Tag, TaskShare
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.tag = Tag.objects.create(name='Urgent', user=self.user)
+        self.task = Task.objects.create(title='Cached Task', user=self.user, category=self.category)
+
+    def _get(self, url, params=None, user=None):
+        self.client.force_authenticate(user=user or self.user)
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_hits_and_misses(self):
+        """Repeated reads are served from the cache and counted"""
+        url = reverse('task-list')
+        self.assertEqual(self._get(url)['X-Cache'], 'MISS')
+        # Only the user's cache generation is read
+        with self.assertNumQueries(1):
+            response = self._get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['results'][0]['title'], 'Cached Task')
+        self.assertEqual(get_cache_stats(), {'hits': 1, 'misses': 1})
+
+        # Query params are normalized, so their order does not matter
+        self._get(f'{url}?priority=LOW&completed=false')
+        self.assertEqual(self._get(f'{url}?completed=false&priority=LOW')['X-Cache'], 'HIT')
+
+        # Each user gets their own entries
+        self.assertEqual(self._get(url, user=self.other_user)['X-Cache'], 'MISS')
+
+    def test_model_changes_invalidate(self):
+        """Task, tag and category writes invalidate the owner's responses"""
+        changes = [
+            lambda: Task.objects.create(title='Another Task', user=self.user),
+            lambda: self.task.tags.add(self.tag),
+            lambda: self.tag.tasks.remove(self.task),
+            lambda: Tag.objects.filter(pk=self.tag.pk).first().save(),
+            lambda: Category.objects.create(name='Home', user=self.user),
+            lambda: self.category.delete(),
+        ]
+        for url in [reverse('task-list'), reverse('tag-list'), reverse('category-list')]:
+            self._get(url)
+        for change in changes:
+            for url in [reverse('task-list'), reverse('tag-list'), reverse('category-list')]:
+                self._get(url)
+            change()
+            for url in [reverse('task-list'), reverse('tag-list'), reverse('category-list')]:
+                self.assertEqual(self._get(url)['X-Cache'], 'MISS')
+
+    def test_sharing_invalidates_recipients(self):
+        """Shared task changes reach every recipient's cached lists"""
+        url = reverse('task-list')
+        self.assertEqual(self._get(url, user=self.other_user).data['results'], [])
+
+        share = TaskShare.objects.create(task=self.task, shared_with=self.other_user)
+        response = self._get(url, user=self.other_user)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 1)
+
+        # An owner edit reaches the recipient
+        self.task.title = 'Renamed Task'
+        self.task.save()
+        response = self._get(url, user=self.other_user)
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed Task')
+
+        # So does a tag change on the shared task
+        self._get(url, user=self.other_user)
+        self.task.tags.add(self.tag)
+        self.assertEqual(self._get(url, user=self.other_user)['X-Cache'], 'MISS')
+
+        share.delete()
+        self.assertEqual(self._get(url, user=self.other_user).data['results'], [])
+
+    def test_file_based_backend(self):
+        """The cache works with the file-based backend as well"""
+        with tempfile.TemporaryDirectory() as location:
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }}):
+                url = reverse('task-list')
+                self.assertEqual(self._get(url)['X-Cache'], 'MISS')
+                self.assertEqual(self._get(url)['X-Cache'], 'HIT')
+                Task.objects.create(title='Another Task', user=self.user)
+                response = self._get(url)
+                self.assertEqual(response['X-Cache'], 'MISS')
+                self.assertEqual(len(response.data['results']), 2)
+                self.assertEqual(get_cache_stats(), {'hits': 1, 'misses': 2})
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(title='Conditional Task', user=self.user)
+
+    def test_etag_on_list_and_detail(self):
+        """Unchanged data is answered with 304 after reading only the cache generation"""
+        for url in [reverse('task-list'), reverse('task-detail', kwargs={'pk': self.task.pk}), reverse('tag-popular')]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response['ETag']
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            Tag.objects.create(name=f'Tag for {url}', user=self.user)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_writes_from_other_workers(self):
+        """Validators and cached lists follow writes made by a worker with its own cache"""
+        url = reverse('task-list')
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        other_worker = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'other-worker',
+        }}
+        with override_settings(CACHES=other_worker):
+            self.task.title = 'Renamed Task'
+            self.task.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed Task')
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_varies_with_query(self):
+        """Different filters get different validators"""
+        url = reverse('task-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, {'completed': 'true'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_last_modified(self):
+        """If-Modified-Since is honoured until the user's data changes"""
+        url = reverse('task-list')
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.task.completed = True
+        self.task.save()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_upcoming_notifications_etag(self):
+        """Upcoming notifications revalidate when the pending set changes"""
+        from django.utils import timezone
+        from ..models import TaskNotification
+        url = reverse('task-upcoming-notifications')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        TaskNotification.objects.create(
+            task=self.task,
+            user=self.user,
+            scheduled_time=timezone.now() + timezone.timedelta(hours=1)
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+
+from django.test import TestCase, override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from ..cache import get_cache
+from ..exports import CSV_COLUMNS
+from ..models import Task, Category, Tag, TaskShare
+
+class TaskExportTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.tags = [Tag.objects.create(name=f'Tag {i}', user=self.user) for i in range(2)]
+        for i in range(5):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                user=self.user,
+                category=self.category if i % 2 else None,
+                priority='HIGH' if i % 2 else 'LOW',
+                due_date=timezone.now() + timezone.timedelta(days=i + 1)
+            )
+            task.tags.add(*self.tags[:i % 3])
+        TaskShare.objects.create(task=task, shared_with=self.other_user)
+        shared = Task.objects.create(title='Shared with me', user=self.other_user)
+        TaskShare.objects.create(task=shared, shared_with=self.user)
+        Task.objects.create(title='Hidden', user=self.other_user)
+        self.url = reverse('task-export')
+
+    def _export(self, params=None):
+        response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_matches_task_list(self):
+        """Each line is the task as the list endpoint renders it"""
+        lines = self._export({'format': 'ndjson'}).splitlines()
+        listed = self.client.get(reverse('task-list')).json()['results']
+        self.assertEqual([json.loads(line) for line in lines], listed)
+        self.assertEqual(len(lines), 6)
+
+    def test_ndjson_is_the_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('tasks.ndjson', response['Content-Disposition'])
+
+    def test_csv(self):
+        """CSV rows flatten the category, tags and shares"""
+        response = self.client.get(self.url, {'format': 'csv', 'ordering': '-due_date'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(list(rows[0].keys()), CSV_COLUMNS)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['title'], 'Task 4')
+        self.assertEqual(rows[0]['category'], '')
+        self.assertEqual(rows[0]['shared_with'], 'otheruser')
+        self.assertEqual(rows[1]['category'], 'Work')
+        self.assertEqual(rows[2]['tags'], 'Tag 0;Tag 1')
+        self.assertEqual(rows[3]['shared_with'], '')
+
+    def test_filters(self):
+        """The list filters, search and ordering apply to the export"""
+        lines = self._export({'priority': 'HIGH', 'ordering': 'due_date'}).splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['Task 1', 'Task 3'])
+
+        lines = self._export({'search': 'Shared'}).splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['Shared with me'])
+
+        response = self.client.get(self.url, {'priority': 'NOPE'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(TODO_EXPORT_CHUNK_SIZE=2)
+    def test_relations_are_prefetched_per_chunk(self):
+        """One query for the tasks plus one per relation per chunk of tasks"""
+        response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(len(queries), 1 + 3 * 3)
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..cache import get_cache
+from ..models import Task, Category, Tag, TaskNotification, TaskVisibility
+
+def ndjson(*rows):
+    return ''.join(row if isinstance(row, str) else json.dumps(row) + '\n' for row in rows).encode('utf-8')
+
+class TaskImportTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.work = Category.objects.create(name='Work', user=self.user)
+        self.foreign = Category.objects.create(name='Theirs', user=self.other_user)
+        self.url = reverse('task-import')
+
+    def _upload(self, content, name='tasks.ndjson', **data):
+        return self.client.post(self.url, {'file': SimpleUploadedFile(name, content), **data}, format='multipart')
+
+    def test_ndjson(self):
+        """Valid rows are imported with their categories, tags and reminders"""
+        content = ndjson(
+            {'title': 'Report', 'category': 'Work', 'tags': ['Urgent', 'Office'], 'due_date': '2030-01-02T10:00:00Z'},
+            {'title': 'Groceries', 'category': {'name': 'Home'}, 'tags': [{'name': 'Urgent'}], 'priority': 'LOW'},
+            {'title': 'Bad priority', 'priority': 'NOPE'},
+            'not json\n',
+            '\n',
+            {'description': 'No title'},
+            {'title': 'Foreign category', 'category_id': self.foreign.id},
+        )
+        response = self._upload(content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rows'], 6)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(response.data['failed'], 4)
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4, 6, 7])
+        self.assertIn('priority', response.data['errors'][0]['errors'])
+        self.assertIn('title', response.data['errors'][2]['errors'])
+        self.assertIn('category_id', response.data['errors'][3]['errors'])
+
+        report = Task.objects.get(title='Report')
+        self.assertEqual(report.category, self.work)
+        self.assertEqual(sorted(report.tag_list()), ['Office', 'Urgent'])
+        self.assertTrue(TaskNotification.objects.filter(task=report, status='PENDING').exists())
+        groceries = Task.objects.get(title='Groceries')
+        self.assertEqual(groceries.category.name, 'Home')
+        self.assertEqual(groceries.priority, 'LOW')
+        self.assertEqual(Tag.objects.filter(user=self.user, name='Urgent').count(), 1)
+        self.assertEqual(
+            set(TaskVisibility.objects.filter(user=self.user).values_list('task__title', flat=True)),
+            {'Report', 'Groceries'}
+        )
+
+        # The imported tasks show up in the (cached) task list
+        response = self.client.get(reverse('task-list'))
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_csv_export_round_trip(self):
+        """A CSV export can be imported by another user"""
+        task = Task.objects.create(title='Shared plan', description='Line one\nline two', user=self.user, category=self.work)
+        task.tags.add(Tag.objects.create(name='A', user=self.user), Tag.objects.create(name='B', user=self.user))
+        exported = b''.join(self.client.get(reverse('task-export'), {'format': 'csv'}).streaming_content)
+
+        self.client.force_authenticate(user=self.other_user)
+        response = self._upload(exported, name='tasks.csv')
+        self.assertEqual(response.data['imported'], 1)
+        copy = Task.objects.get(user=self.other_user)
+        self.assertEqual(copy.description, 'Line one\nline two')
+        self.assertEqual(copy.category.name, 'Work')
+        self.assertEqual(copy.category.user, self.other_user)
+        self.assertEqual(sorted(copy.tag_list()), ['A', 'B'])
+
+    @override_settings(TODO_IMPORT_CHUNK_SIZE=2)
+    def test_chunks_are_committed_separately(self):
+        """An unreadable line stops the import but keeps the chunks before it"""
+        content = ndjson(*[{'title': f'Task {i}'} for i in range(4)]) + b'\xff\n'
+        response = self._upload(content)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['imported'], 4)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 4)
+
+    def test_requires_a_file(self):
+        response = self.client.post(self.url, {}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self._upload(ndjson({'title': 'Task'}), format='xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command(self):
+        """import_tasks reports progress per chunk and errors by line"""
+        with tempfile.NamedTemporaryFile('wb', suffix='.ndjson', delete=False) as f:
+            f.write(ndjson(*[{'title': f'Task {i}'} for i in range(5)], {'title': ''}))
+        self.addCleanup(os.remove, f.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_tasks', 'otheruser', f.name, '--chunk-size', '2', stdout=out, stderr=err)
+        self.assertIn('2 rows read, 2 imported, 0 failed', out.getvalue())
+        self.assertIn('Imported 5 of 6 tasks', out.getvalue())
+        self.assertIn('Line 6', err.getvalue())
+        self.assertEqual(Task.objects.filter(user=self.other_user).count(), 5)
@@ -0,0 +1,68 @@
+import re
+import unittest
+from django.test import TestCase
+from django.db import connection
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from ..models import Task, Tag, TaskShare, TaskNotification
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class QueryPlanTestCase(TestCase):
+    """Guard the hot task/notification queries against full table scans"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.now = timezone.now()
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        full_scans = [
+            line for line in plan.splitlines()
+            if re.search(r'\bSCAN (TABLE )?to_do_app_\w+\b', line) and 'USING' not in line
+        ]
+        self.assertEqual(full_scans, [], f'{queryset.query}\n{plan}')
+
+    def test_task_access_patterns(self):
+        """Per-user task filters and the default ordering use an index"""
+        querysets = [
+            Task.objects.filter(user=self.user, completed=True),
+            Task.objects.filter(user=self.user, priority='HIGH'),
+            Task.objects.filter(user=self.user, category_id=1),
+            Task.objects.filter(user=self.user, due_date__lte=self.now),
+            Task.objects.filter(user=self.user).order_by('-created_at'),
+            Task.objects.filter(visibility__user=self.user, completed=False),
+        ]
+        for queryset in querysets:
+            self.assertUsesIndex(queryset)
+
+    def test_notification_access_patterns(self):
+        """The sender scan and upcoming_notifications use an index"""
+        self.assertUsesIndex(
+            TaskNotification.objects.filter(
+                status='PENDING',
+                scheduled_time__lte=self.now
+            ).order_by('scheduled_time')
+        )
+        self.assertUsesIndex(
+            TaskNotification.objects.filter(
+                user=self.user,
+                status='PENDING',
+                scheduled_time__gte=self.now
+            )
+        )
+
+    def test_share_access_patterns(self):
+        """Looking up shares by recipient uses an index"""
+        self.assertUsesIndex(TaskShare.objects.filter(shared_with=self.user))
+        self.assertUsesIndex(TaskShare.objects.filter(shared_with=self.user, task_id=1))
+
+    def test_popular_tags_pattern(self):
+        """Popular tags are read in index order, without sorting"""
+        queryset = Tag.objects.filter(user=self.user).order_by('-task_count', 'name')[:10]
+        self.assertUsesIndex(queryset)
+        self.assertNotIn('TEMP B-TREE', queryset.explain())
@@ -1,7 +1,7 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from ..models import Task, Category, Tag, TaskShare, NotificationPreference
+from ..models import Task, Category, Tag, TaskShare, NotificationPreference, TaskVisibility
 
 class ModelTestCase(TestCase):
     def setUp(self):
@@ -53,8 +53,9 @@ class ModelTestCase(TestCase):
         self.assertEqual(self.task.tag_list(), ['Test Tag'])
 
     def test_tag_task_count(self):
-        """Test the task_count method of Tag"""
-        self.assertEqual(self.tag.task_count(), 1)
+        """Test the stored task_count of Tag"""
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.task_count, 1)
 
     def test_category_unique_constraint(self):
         """Test that a user cannot have two categories with the same name"""
@@ -103,4 +104,29 @@ class ModelTestCase(TestCase):
         
         self.assertEqual(str(pref), "testuser's notification preferences")
         self.assertTrue(pref.email_notifications)
-        self.assertEqual(pref.notification_timing, '24H') 
\ No newline at end of file
+        self.assertEqual(pref.notification_timing, '24H')
+
+    def test_task_visibility_sync(self):
+        """Visibility rows follow task creation and share changes"""
+        other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.assertEqual(
+            list(TaskVisibility.objects.filter(task=self.task).values_list('user', 'permission')),
+            [(self.user.id, 'OWNER')]
+        )
+
+        share = TaskShare.objects.create(task=self.task, shared_with=other_user)
+        visibility = TaskVisibility.objects.get(task=self.task, user=other_user)
+        self.assertEqual(visibility.permission, 'VIEW')
+
+        share.permission = 'EDIT'
+        share.save()
+        visibility.refresh_from_db()
+        self.assertEqual(visibility.permission, 'EDIT')
+
+        share.delete()
+        self.assertFalse(TaskVisibility.objects.filter(task=self.task, user=other_user).exists())
+        self.assertTrue(TaskVisibility.objects.filter(task=self.task, user=self.user).exists())
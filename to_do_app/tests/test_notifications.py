@@ -0,0 +1,535 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.core import mail
+from django.core.management import call_command
+from django.core.mail.backends.locmem import EmailBackend
+from django.utils import timezone
+from ..models import NotificationPreference, Task, TaskNotification
+from ..notifications import claim_notifications, send_task_notifications
+
+class RecordingBackend(EmailBackend):
+    """locmem backend that records each send_messages call and rejects bad addresses"""
+    calls = []
+    opened = 0
+
+    def open(self):
+        RecordingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        RecordingBackend.calls.append(len(messages))
+        for message in messages:
+            if any(address.endswith('@invalid') for address in message.to):
+                raise ValueError(f'Recipient refused: {message.to[0]}')
+        return super().send_messages(messages)
+
+@override_settings(
+    EMAIL_BACKEND='to_do_app.tests.test_notifications.RecordingBackend',
+    TODO_NOTIFICATION_BATCH_SIZE=4
+)
+class BatchedNotificationTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        RecordingBackend.calls = []
+        RecordingBackend.opened = 0
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+
+    def _notify(self, count, user=None):
+        notifications = []
+        for i in range(count):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                user=user or self.user,
+                due_date=timezone.now() + timezone.timedelta(hours=1)
+            )
+            notifications.append(TaskNotification.objects.create(
+                task=task,
+                user=user or self.user,
+                scheduled_time=timezone.now() - timezone.timedelta(minutes=1)
+            ))
+        return notifications
+
+    def test_batches_share_one_connection(self):
+        """Messages go out in batches over a single connection"""
+        self._notify(10)
+        send_task_notifications()
+        self.assertEqual(len(mail.outbox), 10)
+        self.assertEqual(RecordingBackend.calls, [4, 4, 2])
+        self.assertEqual(RecordingBackend.opened, 1)
+        self.assertEqual(TaskNotification.objects.filter(status='SENT', sent_at__isnull=False).count(), 10)
+        self.assertEqual(mail.outbox[0].subject, 'Task Due Soon: Task 0')
+
+    def test_query_count_per_batch(self):
+        """Each batch costs the same queries: claim, digest claim, fetch, status updates, invalidation"""
+        self._notify(4)
+        with CaptureQueriesContext(connection) as one_batch:
+            send_task_notifications()
+        TaskNotification.objects.update(status='PENDING')
+        self._notify(4)
+        with CaptureQueriesContext(connection) as two_batches:
+            send_task_notifications()
+        # The deferred reschedule check and final empty claim are shared by both runs
+        per_batch = len(two_batches) - len(one_batch)
+        self.assertEqual(len(one_batch) - per_batch, 4)
+        self.assertEqual(per_batch, 12)
+
+    def test_failed_batch_falls_back_to_single_messages(self):
+        """A rejected recipient only fails its own notification"""
+        sent = self._notify(3)
+        bad_user = get_user_model().objects.create_user(
+            username='baduser',
+            email='bad@invalid',
+            password='testpass123'
+        )
+        failed = self._notify(1, user=bad_user)[0]
+        send_task_notifications()
+
+        self.assertEqual(RecordingBackend.calls, [4, 1, 1, 1, 1])
+        for notification in sent:
+            notification.refresh_from_db()
+            self.assertEqual(notification.status, 'SENT')
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, 'FAILED')
+        self.assertIn('bad@invalid', failed.error_message)
+
+    @override_settings(TODO_NOTIFICATION_RETRY_SECONDS=60, TODO_NOTIFICATION_MAX_ATTEMPTS=3)
+    def test_failures_are_retried_with_backoff(self):
+        """Failed reminders wait a growing, jittered delay and are dead after the last attempt"""
+        bad_user = get_user_model().objects.create_user(
+            username='baduser',
+            email='bad@invalid',
+            password='testpass123'
+        )
+        notification = self._notify(1, user=bad_user)[0]
+        delays = []
+        for attempt in range(1, 4):
+            start = timezone.now()
+            send_task_notifications()
+            notification.refresh_from_db()
+            self.assertEqual(notification.attempts, attempt)
+            if attempt < 3:
+                self.assertEqual(notification.status, 'FAILED')
+                delays.append((notification.next_attempt_at - start).total_seconds())
+                # Nothing is retried before next_attempt_at
+                send_task_notifications()
+                notification.refresh_from_db()
+                self.assertEqual(notification.attempts, attempt)
+                TaskNotification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(notification.status, 'DEAD')
+        self.assertIsNone(notification.next_attempt_at)
+        self.assertTrue(30 <= delays[0] <= 61)
+        self.assertTrue(60 <= delays[1] <= 121)
+
+    def test_retry_succeeds(self):
+        """A retry that goes through marks the reminder sent"""
+        notification = self._notify(1)[0]
+        TaskNotification.objects.update(status='FAILED', attempts=1, next_attempt_at=timezone.now())
+        send_task_notifications()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'SENT')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_digest_groups_reminders_per_user(self):
+        """Digest users get one email for all of their due reminders"""
+        NotificationPreference.objects.create(user=self.user, digest_frequency='DAILY')
+        other = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self._notify(6)
+        self._notify(2, user=other)
+        send_task_notifications()
+
+        digest = [message for message in mail.outbox if message.to == ['test@example.com']]
+        self.assertEqual(len(digest), 1)
+        self.assertEqual(digest[0].subject, '6 Tasks Due Soon')
+        for i in range(6):
+            self.assertIn(f'Task {i}', digest[0].body)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(TaskNotification.objects.filter(status='SENT').count(), 8)
+        self.assertIsNotNone(NotificationPreference.objects.get(user=self.user).last_digest_sent_at)
+
+    def test_digest_waits_for_its_period(self):
+        """Reminders due within a digest period wait for the next digest"""
+        NotificationPreference.objects.create(
+            user=self.user,
+            digest_frequency='HOURLY',
+            last_digest_sent_at=timezone.now() - timezone.timedelta(minutes=30)
+        )
+        self._notify(2)
+        send_task_notifications()
+        self.assertEqual(mail.outbox, [])
+
+        NotificationPreference.objects.update(last_digest_sent_at=timezone.now() - timezone.timedelta(hours=2))
+        send_task_notifications()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(TaskNotification.objects.filter(status='SENT').count(), 2)
+
+class NotificationClaimTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.notifications = []
+        for i in range(6):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                user=self.user,
+                due_date=timezone.now() + timezone.timedelta(hours=1)
+            )
+            self.notifications.append(TaskNotification.objects.create(
+                task=task,
+                user=self.user,
+                scheduled_time=timezone.now() - timezone.timedelta(minutes=i + 1)
+            ))
+
+    def _claimed(self, token):
+        return set(TaskNotification.objects.filter(claim_token=token).values_list('pk', flat=True))
+
+    def test_claims_do_not_overlap(self):
+        """Concurrent claims split the due rows between workers"""
+        first = self._claimed(claim_notifications(4))
+        second = self._claimed(claim_notifications(4))
+        self.assertEqual(len(first), 4)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(first & second)
+        self.assertIsNone(claim_notifications(4))
+
+    def test_expired_lease_is_recovered(self):
+        """Rows claimed by a worker that died are claimed again after the lease"""
+        claimed = self._claimed(claim_notifications(6, lease=60))
+        self.assertIsNone(claim_notifications(6))
+        TaskNotification.objects.filter(pk__in=sorted(claimed)[:2]).update(
+            claimed_until=timezone.now() - timezone.timedelta(seconds=1)
+        )
+        self.assertEqual(len(self._claimed(claim_notifications(6))), 2)
+
+    def test_claim_locks_only_notifications(self):
+        """The claimable() query is locked with FOR UPDATE OF the notification table"""
+        NotificationPreference.objects.create(user=self.user, digest_frequency='DAILY')
+        features = connection.features
+        with mock.patch.object(features, 'has_select_for_update_skip_locked', True), \
+                CaptureQueriesContext(connection) as queries:
+            token = claim_notifications(2)
+        self.assertEqual(len(self._claimed(token)), 6)
+        if features.has_select_for_update and features.has_select_for_update_of:
+            locking = [query['sql'] for query in queries if 'FOR UPDATE' in query['sql']]
+            self.assertEqual(len(locking), 1)
+            self.assertIn('FOR UPDATE OF', locking[0])
+            self.assertNotIn('auth_user', locking[0].split('FOR UPDATE OF')[1])
+
+    def test_dispatch_command(self):
+        """The dispatcher sends every due reminder once and releases the claims"""
+        out = StringIO()
+        call_command('dispatch_notifications', workers=1, once=True, batch_size=4, stdout=out)
+        self.assertIn('Processed 6 notifications', out.getvalue())
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertFalse(TaskNotification.objects.exclude(status='SENT').exists())
+        self.assertFalse(TaskNotification.objects.filter(claim_token__isnull=False).exists())
+
+class ParallelDispatchTestCase(TransactionTestCase):
+    def test_workers_send_each_reminder_once(self):
+        """Several workers together send every reminder exactly once"""
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('In-memory SQLite fails concurrent writers instead of making them wait')
+        user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        for i in range(40):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                user=user,
+                due_date=timezone.now() + timezone.timedelta(hours=1)
+            )
+            TaskNotification.objects.create(task=task, user=user, scheduled_time=timezone.now())
+
+        call_command('dispatch_notifications', workers=4, once=True, batch_size=5, interval=0.05, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(sorted(message.subject for message in mail.outbox), sorted(f'Task Due Soon: Task {i}' for i in range(40)))
+        self.assertEqual(TaskNotification.objects.filter(status='SENT').count(), 40)
+
+class NotificationSchedulingTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _pending(self, task_id):
+        return list(TaskNotification.objects.filter(task_id=task_id, status='PENDING'))
+
+    def test_due_date_edits_move_the_pending_reminder(self):
+        """Rescheduling updates the one pending reminder in place"""
+        due_date = timezone.now() + timezone.timedelta(days=3)
+        response = self.client.post(reverse('task-list'), {'title': 'Edited', 'due_date': due_date.isoformat()}, format='json')
+        task_id = response.data['id']
+        original = self._pending(task_id)[0]
+
+        for days in [4, 5, 6]:
+            due_date = timezone.now() + timezone.timedelta(days=days)
+            self.client.patch(reverse('task-detail', kwargs={'pk': task_id}), {'due_date': due_date.isoformat()}, format='json')
+        pending = self._pending(task_id)
+        self.assertEqual([notification.pk for notification in pending], [original.pk])
+        self.assertEqual(pending[0].scheduled_time, due_date - timezone.timedelta(hours=24))
+
+        self.client.patch(reverse('task-detail', kwargs={'pk': task_id}), {'due_date': None}, format='json')
+        self.assertEqual(self._pending(task_id), [])
+
+    def test_due_date_round_trip(self):
+        """A reminder can return to a time that already has a sent or cancelled one"""
+        due_date = timezone.now() + timezone.timedelta(days=3)
+        remind_at = due_date - timezone.timedelta(hours=24)
+        task = Task.objects.create(title='Round trip', user=self.user, due_date=due_date)
+        TaskNotification.objects.create(task=task, user=self.user, scheduled_time=remind_at, status='SENT')
+        TaskNotification.objects.create(task=task, user=self.user, scheduled_time=remind_at, status='CANCELLED')
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+
+        # Moving away inserts a reminder, moving back moves it onto the old time
+        for date in [due_date + timezone.timedelta(days=1), due_date]:
+            response = self.client.patch(url, {'due_date': date.isoformat()}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([notification.scheduled_time for notification in self._pending(task.pk)], [remind_at])
+
+        # Dropping the reminder and scheduling it again inserts a fresh one
+        self.client.patch(url, {'due_date': None}, format='json')
+        response = self.client.patch(url, {'due_date': due_date.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([notification.scheduled_time for notification in self._pending(task.pk)], [remind_at])
+
+    def test_bulk_due_date_edits_upsert(self):
+        """Bulk updates reschedule existing reminders and add missing ones"""
+        due_date = timezone.now() + timezone.timedelta(days=3)
+        scheduled = Task.objects.create(title='Scheduled', user=self.user, due_date=due_date)
+        TaskNotification.objects.create(task=scheduled, user=self.user, scheduled_time=due_date)
+        unscheduled = Task.objects.create(title='Unscheduled', user=self.user)
+
+        new_due_date = due_date + timezone.timedelta(days=1)
+        response = self.client.post(reverse('task-bulk'), {'update': [
+            {'id': scheduled.id, 'due_date': new_due_date.isoformat()},
+            {'id': unscheduled.id, 'due_date': new_due_date.isoformat()},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for task in [scheduled, unscheduled]:
+            pending = self._pending(task.id)
+            self.assertEqual(len(pending), 1)
+            self.assertEqual(pending[0].scheduled_time, new_due_date - timezone.timedelta(hours=24))
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_due_date_edit_moves_a_failed_retry(self):
+        """A failed reminder waiting for a retry is the one that gets rescheduled"""
+        task = Task.objects.create(title='Retried', user=self.user, due_date=timezone.now() + timezone.timedelta(hours=2))
+        TaskNotification.objects.create(
+            task=task, user=self.user, scheduled_time=timezone.now() - timezone.timedelta(hours=22),
+            status='FAILED', attempts=1, next_attempt_at=timezone.now() - timezone.timedelta(minutes=1)
+        )
+        due_date = timezone.now() + timezone.timedelta(hours=1)
+        self.client.patch(reverse('task-detail', kwargs={'pk': task.pk}), {'due_date': due_date.isoformat()}, format='json')
+
+        notification = TaskNotification.objects.get(task=task)
+        self.assertEqual(notification.status, 'PENDING')
+        self.assertEqual(notification.scheduled_time, due_date - timezone.timedelta(hours=24))
+        self.assertIsNone(notification.next_attempt_at)
+        send_task_notifications()
+        self.assertEqual(len(mail.outbox), 1)
+
+class NotificationReschedulingTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.pref = NotificationPreference.objects.create(user=self.user)
+        self.url = reverse('notification-preference-detail', kwargs={'pk': self.pref.pk})
+
+    def _create_tasks(self, count):
+        due_date = timezone.now() + timezone.timedelta(days=10)
+        for i in range(count):
+            task = Task.objects.create(title=f'Task {i}', user=self.user, due_date=due_date)
+            TaskNotification.objects.create(
+                task=task,
+                user=self.user,
+                scheduled_time=due_date - timezone.timedelta(hours=24)
+            )
+        return due_date
+
+    def _pending_times(self):
+        return set(
+            TaskNotification.objects.filter(user=self.user, status='PENDING').values_list('scheduled_time', flat=True)
+        )
+
+    def test_timing_change_moves_pending_reminders(self):
+        """Changing the timing reschedules every pending reminder"""
+        due_date = self._create_tasks(3)
+        response = self.client.patch(self.url, {'notification_timing': '1W'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._pending_times(), {due_date - timezone.timedelta(weeks=1)})
+
+    def test_disable_and_enable(self):
+        """Disabling cancels pending reminders and enabling recreates them"""
+        due_date = self._create_tasks(3)
+        self.client.patch(self.url, {'email_notifications': False}, format='json')
+        self.assertEqual(self._pending_times(), set())
+        self.assertEqual(TaskNotification.objects.filter(status='CANCELLED').count(), 3)
+        response = self.client.get(reverse('task-upcoming-notifications'))
+        self.assertEqual(response.data, [])
+
+        self.client.patch(self.url, {'email_notifications': True, 'notification_timing': '3H'}, format='json')
+        self.assertEqual(self._pending_times(), {due_date - timezone.timedelta(hours=3)})
+        self.assertEqual(TaskNotification.objects.filter(status='PENDING').count(), 3)
+
+    def test_enable_with_the_cancelled_timing(self):
+        """Cancelled and dead reminders at the same time do not block new ones"""
+        due_date = self._create_tasks(3)
+        self.client.patch(self.url, {'email_notifications': False}, format='json')
+        response = self.client.patch(self.url, {'email_notifications': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(TaskNotification.objects.filter(status='PENDING').count(), 3)
+
+        # Moving the new reminders back onto the cancelled ones' time
+        dead = TaskNotification.objects.filter(status='CANCELLED').first()
+        TaskNotification.objects.filter(pk=dead.pk).update(status='DEAD')
+        for timing in ['3H', '24H']:
+            response = self.client.patch(self.url, {'notification_timing': timing}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._pending_times(), {due_date - timezone.timedelta(hours=24)})
+        self.assertEqual(TaskNotification.objects.filter(status='PENDING').count(), 3)
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_disable_cancels_queued_retries(self):
+        """Turning email off also cancels failed reminders waiting for a retry"""
+        self._create_tasks(2)
+        TaskNotification.objects.update(
+            status='FAILED', attempts=1, next_attempt_at=timezone.now() - timezone.timedelta(minutes=1)
+        )
+        self.client.patch(self.url, {'email_notifications': False}, format='json')
+        self.assertEqual(TaskNotification.objects.filter(status='CANCELLED').count(), 2)
+        send_task_notifications()
+        self.assertEqual(mail.outbox, [])
+
+        # Enabling again schedules the tasks afresh, without duplicates
+        self._create_tasks(1)
+        TaskNotification.objects.filter(status='PENDING').update(
+            status='FAILED', attempts=1, next_attempt_at=timezone.now() + timezone.timedelta(minutes=5)
+        )
+        response = self.client.patch(self.url, {'email_notifications': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(TaskNotification.objects.filter(status='PENDING').count(), 3)
+        self.assertEqual(TaskNotification.objects.filter(status='FAILED').count(), 0)
+        # Each _create_tasks() call picks its own due date
+        due_dates = Task.objects.filter(user=self.user).values_list('due_date', flat=True)
+        self.assertEqual(self._pending_times(), {due - timezone.timedelta(hours=24) for due in due_dates})
+
+    def test_reschedule_query_count(self):
+        """Rescheduling costs the same number of queries for any number of tasks"""
+        def count(timing):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.patch(self.url, {'notification_timing': timing}, format='json')
+            return len(queries)
+
+        self._create_tasks(2)
+        small = count('1H')
+        self._create_tasks(20)
+        self.assertEqual(count('3H'), small)
+
+    @override_settings(TODO_RESCHEDULE_INLINE_LIMIT=1, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_large_changes_are_deferred(self):
+        """Users over the inline limit are rescheduled by the dispatcher"""
+        due_date = self._create_tasks(2)
+        self.client.patch(self.url, {'notification_timing': '48H'}, format='json')
+        self.pref.refresh_from_db()
+        self.assertTrue(self.pref.reschedule_pending)
+        self.assertEqual(self._pending_times(), {due_date - timezone.timedelta(hours=24)})
+
+        send_task_notifications()
+        self.pref.refresh_from_db()
+        self.assertFalse(self.pref.reschedule_pending)
+        self.assertEqual(self._pending_times(), {due_date - timezone.timedelta(hours=48)})
+
+class PurgeNotificationsTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.task = Task.objects.create(title='Task', user=self.user)
+        old = timezone.now() - timezone.timedelta(days=100)
+        statuses = ['SENT', 'SENT', 'DUPLICATE', 'CANCELLED', 'DEAD', 'FAILED', 'FAILED', 'PENDING']
+        for i, status_ in enumerate(statuses):
+            TaskNotification.objects.create(
+                task=self.task,
+                user=self.user,
+                scheduled_time=old + timezone.timedelta(minutes=i),
+                status=status_,
+                # One failure still has a retry scheduled
+                next_attempt_at=timezone.now() if i == 6 else None
+            )
+        TaskNotification.objects.update(updated_at=old)
+        self.recent = TaskNotification.objects.create(
+            task=self.task, user=self.user, scheduled_time=timezone.now(), status='SENT'
+        )
+
+    def _purge(self, *args):
+        out = StringIO()
+        call_command('purge_notifications', *args, stdout=out)
+        return out.getvalue()
+
+    def test_purges_old_finished_notifications_in_batches(self):
+        """Only finished rows past the retention age are deleted"""
+        with CaptureQueriesContext(connection) as queries:
+            output = self._purge('--days', '30', '--batch-size', '2')
+        self.assertIn('Purged 6 notifications', output)
+        self.assertEqual(
+            sorted(TaskNotification.objects.values_list('status', flat=True)),
+            ['FAILED', 'PENDING', 'SENT']
+        )
+        self.assertTrue(TaskNotification.objects.filter(pk=self.recent.pk).exists())
+        # Select, delete and invalidate per batch, with no per-row queries
+        viewer_lookups = [query for query in queries if 'to_do_app_taskvisibility' in query['sql']]
+        self.assertEqual(len(viewer_lookups), 3)
+        self.assertLess(len(queries), 25)
+
+    def test_dry_run(self):
+        """A dry run only counts"""
+        output = self._purge('--days', '30', '--dry-run')
+        self.assertIn('Would purge 6 notifications', output)
+        self.assertEqual(TaskNotification.objects.count(), 9)
+
+    def test_archive(self):
+        """Archived rows are written as JSON lines before they are deleted"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'archive.jsonl')
+            self._purge('--days', '30', '--archive', path)
+            with open(path) as archive:
+                rows = [json.loads(line) for line in archive]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['status'], 'SENT')
+        self.assertEqual(rows[0]['task_id'], self.task.pk)
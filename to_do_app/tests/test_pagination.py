@@ -0,0 +1,106 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from ..models import Task, Tag
+
+class TaskCursorPaginationTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tag = Tag.objects.create(name='Paged', user=self.user)
+
+        # Ties on created_at and null due dates make the tie-breaker matter
+        now = timezone.now()
+        for i in range(11):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                user=self.user,
+                priority=['LOW', 'HIGH', 'URGENT'][i % 3],
+                completed=i % 2 == 0,
+                due_date=None if i % 4 == 0 else now + timezone.timedelta(days=i % 5)
+            )
+            task.tags.add(self.tag)
+        Task.objects.filter(id__in=Task.objects.values('id')[:6]).update(created_at=now)
+
+    def _walk(self, url, params=None):
+        """Follow next links from the first page, returning each page's ids"""
+        pages = []
+        response = self.client.get(url, params or {})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([task['id'] for task in response.data['results']])
+            if not response.data['next']:
+                return pages, response
+            response = self.client.get(response.data['next'])
+
+    def test_pages_cover_ordering_without_gaps(self):
+        """Walking every page returns each task once in the requested order"""
+        url = reverse('task-list')
+        orderings = {
+            None: ['-created_at', '-id'],
+            'due_date': ['due_date', 'id'],
+            '-priority': ['-priority', '-id'],
+        }
+        for ordering, order_by in orderings.items():
+            params = {'page_size': 4}
+            if ordering:
+                params['ordering'] = ordering
+            pages, _ = self._walk(url, params)
+            ids = [task_id for page in pages for task_id in page]
+            expected = list(Task.objects.order_by(*order_by).values_list('id', flat=True))
+            if ordering == 'due_date':
+                expected = (
+                    list(Task.objects.filter(due_date__isnull=False).order_by(*order_by).values_list('id', flat=True)) +
+                    list(Task.objects.filter(due_date__isnull=True).order_by('id').values_list('id', flat=True))
+                )
+            self.assertEqual(ids, expected, ordering)
+            self.assertEqual([len(page) for page in pages], [4, 4, 3])
+
+    def test_previous_links_walk_back(self):
+        """Previous links return the same pages in reverse"""
+        url = reverse('task-list')
+        pages, response = self._walk(url, {'page_size': 4, 'ordering': 'due_date'})
+        self.assertIsNone(self.client.get(url, {'page_size': 4}).data['previous'])
+        for expected in reversed(pages[:-1]):
+            response = self.client.get(response.data['previous'])
+            self.assertEqual([task['id'] for task in response.data['results']], expected)
+        self.assertIsNone(response.data['previous'])
+
+    def test_page_query_count_is_constant(self):
+        """A deep page costs the same number of queries as the first one"""
+        url = reverse('task-list')
+        with self.assertNumQueries(5):
+            first = self.client.get(url, {'page_size': 2})
+        with self.assertNumQueries(5):
+            self.client.get(first.data['next'])
+
+    def test_invalid_cursor(self):
+        """A malformed cursor is reported as not found"""
+        response = self.client.get(reverse('task-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_actions_are_paginated(self):
+        """Every task-returning action pages its results"""
+        cases = [
+            (reverse('task-completed-tasks'), {}),
+            (reverse('task-pending-tasks'), {}),
+            (reverse('task-tasks-by-priority'), {'priority': 'LOW'}),
+            (reverse('task-by-tag'), {'tag_ids[]': [self.tag.id]}),
+            (reverse('tag-tasks', kwargs={'pk': self.tag.id}), {}),
+        ]
+        for url, params in cases:
+            pages, _ = self._walk(url, dict(params, page_size=2))
+            ids = [task_id for page in pages for task_id in page]
+            self.assertEqual(len(ids), len(set(ids)), url)
+            self.assertTrue(all(len(page) <= 2 for page in pages), url)
+        pages, _ = self._walk(reverse('tag-tasks', kwargs={'pk': self.tag.id}), {'page_size': 5})
+        self.assertEqual(sum(len(page) for page in pages), 11)
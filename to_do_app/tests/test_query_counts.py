@@ -0,0 +1,145 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from ..models import Task, Category, Tag, TaskShare, TaskNotification
+from ..serializers import TaskSerializer
+
+class TaskQueryCountTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.tags = [
+            Tag.objects.create(name=f'Tag {i}', user=self.user)
+            for i in range(3)
+        ]
+
+    def _create_tasks(self, count):
+        """Create fully populated tasks so every nested serializer has data"""
+        for i in range(count):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                user=self.user,
+                category=self.category,
+                priority='HIGH',
+                completed=bool(i % 2),
+                due_date=timezone.now() + timezone.timedelta(days=1)
+            )
+            task.tags.add(*self.tags)
+            TaskShare.objects.create(task=task, shared_with=self.other_user)
+            TaskNotification.objects.create(
+                task=task,
+                user=self.user,
+                scheduled_time=timezone.now()
+            )
+
+    def _count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def assertConstantQueries(self, url, params=None):
+        self._create_tasks(2)
+        small = self._count_queries(url, params)
+        self._create_tasks(8)
+        large = self._count_queries(url, params)
+        self.assertEqual(small, large)
+
+    def test_task_list_query_count(self):
+        """Listing tasks costs the same number of queries regardless of size"""
+        self.assertConstantQueries(reverse('task-list'))
+
+    def test_task_actions_query_count(self):
+        """The list-style task actions share the same prefetch plan"""
+        self._create_tasks(2)
+        cases = [
+            ('task-completed-tasks', None),
+            ('task-pending-tasks', None),
+            ('task-tasks-by-category', {'category_id': self.category.id}),
+            ('task-tasks-by-priority', {'priority': 'HIGH'}),
+            ('task-by-tag', {'tag_ids[]': [self.tags[0].id]}),
+        ]
+        small = [self._count_queries(reverse(name), params) for name, params in cases]
+        self._create_tasks(8)
+        large = [self._count_queries(reverse(name), params) for name, params in cases]
+        self.assertEqual(small, large)
+
+    def test_tag_tasks_query_count(self):
+        """Tasks for a tag are loaded with the same prefetch plan"""
+        self.assertConstantQueries(reverse('tag-tasks', kwargs={'pk': self.tags[0].id}))
+
+    def test_prefetched_tag_counts(self):
+        """Nested tag counts reflect every task using the tag"""
+        self._create_tasks(3)
+        response = self.client.get(reverse('task-list'))
+        for task in response.data['results']:
+            self.assertEqual([tag['task_count'] for tag in task['tags']], [3, 3, 3])
+
+    def test_model_helpers_reuse_prefetch(self):
+        """tag_list reads prefetched data and task_count is stored"""
+        self._create_tasks(1)
+        task = Task.objects.prefetch_related('tags').get()
+        tag = Tag.objects.get(name='Tag 0')
+        with self.assertNumQueries(0):
+            self.assertEqual(task.tag_list(), ['Tag 0', 'Tag 1', 'Tag 2'])
+            self.assertEqual(tag.task_count, 1)
+
+    def test_tag_names_query_count(self):
+        """Tag names are resolved in bulk however many are given"""
+        task = Task.objects.create(title='Tagged', user=self.user)
+        task.tags.add(self.tags[2])
+        request = APIRequestFactory().patch('/')
+        request.user = self.user
+
+        def save(names):
+            serializer = TaskSerializer(task, data={'tag_names': names}, partial=True, context={'request': request})
+            self.assertTrue(serializer.is_valid())
+            with CaptureQueriesContext(connection) as queries:
+                serializer.save()
+            return len(queries)
+
+        self.assertEqual(
+            save(['Tag 0', 'New 0']),
+            save(['Tag 1', 'Tag 2'] + [f'New {i}' for i in range(1, 20)])
+        )
+        self.assertEqual(len(task.tag_list()), 21)
+
+    def test_add_and_remove_tags_query_count(self):
+        """add_tags and remove_tags cost the same for one tag or twenty"""
+        task = Task.objects.create(title='Tagged', user=self.user)
+        add_tags = reverse('task-add-tags', kwargs={'pk': task.pk})
+        remove_tags = reverse('task-remove-tags', kwargs={'pk': task.pk})
+
+        def count(url, names):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(url, {'tag_names': names}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.assertEqual(
+            count(add_tags, ['Tag 0', 'New 0']),
+            count(add_tags, ['Tag 1'] + [f'New {i}' for i in range(1, 20)])
+        )
+        self.assertEqual(len(task.tag_list()), 22)
+        self.assertEqual(
+            count(remove_tags, ['New 0', 'Tag 0']),
+            count(remove_tags, [f'New {i}' for i in range(1, 20)])
+        )
+        self.assertEqual(task.tag_list(), ['Tag 1'])
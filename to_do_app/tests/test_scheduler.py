@@ -0,0 +1,66 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from django.utils import timezone
+from ..models import Task, TaskNotification
+from ..notifications import claim_notifications
+from ..scheduler import ReminderWheel
+
+class ReminderWheelTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.now = timezone.now()
+
+    def _notify(self, offset, title='Task'):
+        task = Task.objects.create(title=title, user=self.user, due_date=self.now + offset)
+        return TaskNotification.objects.create(task=task, user=self.user, scheduled_time=self.now + offset)
+
+    def test_loads_the_window(self):
+        """Only reminders due within the window are queued, in due order"""
+        later = self._notify(timezone.timedelta(minutes=10))
+        overdue = self._notify(timezone.timedelta(minutes=-1))
+        self._notify(timezone.timedelta(hours=2))
+        wheel = ReminderWheel(3600)
+        self.assertEqual(wheel.refresh(self.now), 2)
+        self.assertEqual(wheel.next_due(), overdue.scheduled_time)
+        self.assertEqual(wheel.pop_due(self.now), [overdue.pk])
+        self.assertEqual(wheel.pop_due(self.now + timezone.timedelta(minutes=10)), [later.pk])
+        self.assertIsNone(wheel.next_due())
+
+    def test_refresh_reads_only_changes(self):
+        """Later refreshes pick up new and moved rows and rows entering the window"""
+        distant = self._notify(timezone.timedelta(minutes=90))
+        wheel = ReminderWheel(3600)
+        wheel.refresh(self.now)
+        with self.assertNumQueries(1):
+            self.assertEqual(wheel.refresh(self.now), 0)
+
+        added = self._notify(timezone.timedelta(minutes=5))
+        self.assertEqual(wheel.refresh(self.now), 1)
+
+        # Moving a reminder through the API bumps its updated_at
+        due_date = self.now + timezone.timedelta(hours=24, minutes=30)
+        self.client.patch(reverse('task-detail', kwargs={'pk': added.task_id}), {'due_date': due_date.isoformat()}, format='json')
+        self.assertEqual(wheel.refresh(self.now), 1)
+
+        self.assertEqual(wheel.refresh(self.now + timezone.timedelta(minutes=45)), 1)
+        self.assertIn(distant.pk, wheel.pop_due(self.now + timezone.timedelta(minutes=90)))
+
+    def test_stale_entries_are_not_claimed(self):
+        """A reminder moved after it was queued is not claimed at its old time"""
+        notification = self._notify(timezone.timedelta(minutes=-1))
+        wheel = ReminderWheel(3600)
+        wheel.refresh(self.now)
+        TaskNotification.objects.filter(pk=notification.pk).update(
+            scheduled_time=self.now + timezone.timedelta(minutes=30)
+        )
+        self.assertIsNone(claim_notifications(10, ids=wheel.pop_due()))
+        self.assertEqual(TaskNotification.objects.get().status, 'PENDING')
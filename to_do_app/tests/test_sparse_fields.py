@@ -0,0 +1,87 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from ..cache import get_cache
+from ..models import Task, Category, Tag, TaskShare, TaskNotification
+
+class SparseFieldsetTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.tags = [Tag.objects.create(name=f'Tag {i}', user=self.user) for i in range(2)]
+        for i in range(3):
+            self.task = Task.objects.create(
+                title=f'Task {i}',
+                description='A long description',
+                user=self.user,
+                category=self.category,
+                due_date=timezone.now() + timezone.timedelta(days=1)
+            )
+            self.task.tags.add(*self.tags)
+            self.share = TaskShare.objects.create(task=self.task, shared_with=self.other_user)
+            TaskNotification.objects.create(task=self.task, user=self.user, scheduled_time=timezone.now())
+        self.url = reverse('task-list')
+
+    def _get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, queries
+
+    def test_fields(self):
+        """Only the requested fields are rendered and no relation is loaded"""
+        response, queries = self._get(self.url, {'fields': 'id,title,due_date'})
+        for task in response.data['results']:
+            self.assertEqual(set(task), {'id', 'title', 'due_date'})
+        full, full_queries = self._get(self.url, {'ordering': '-created_at'})
+        self.assertEqual(len(queries), len(full_queries) - 3)
+        self.assertNotIn('description', queries[-1]['sql'])
+        self.assertIn('description', full.data['results'][0])
+
+    def test_relations_as_ids_unless_expanded(self):
+        response, queries = self._get(self.url, {'fields': 'id,category,tags,shares', 'expand': 'tags'})
+        task = response.data['results'][0]
+        self.assertEqual(set(task), {'id', 'category', 'tags', 'shares'})
+        self.assertEqual(task['category'], self.category.id)
+        self.assertEqual(task['shares'], [self.share.id])
+        self.assertEqual([tag['name'] for tag in task['tags']], ['Tag 0', 'Tag 1'])
+        # One query each for the tasks, shares and tags, none for notifications
+        self.assertFalse(any('to_do_app_tasknotification' in query['sql'] for query in queries))
+
+    def test_expand_alone_keeps_every_field(self):
+        response, _ = self._get(reverse('task-detail', kwargs={'pk': self.task.pk}), {'expand': 'category'})
+        self.assertEqual(response.data['category']['name'], 'Work')
+        self.assertEqual(len(response.data['tags']), 2)
+        self.assertIsInstance(response.data['tags'][0], int)
+        self.assertIn('owner_username', response.data)
+
+    def test_unknown_fields(self):
+        response = self.client.get(self.url, {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+        response = self.client.get(self.url, {'expand': 'title'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_ignore_fields(self):
+        """Sparse fieldsets only trim reads"""
+        response = self.client.post(f'{self.url}?fields=id', {'title': 'New'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['title'], 'New')
@@ -0,0 +1,150 @@
+from io import StringIO
+
+from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from ..cache import get_cache
+from ..models import Task, Category, TaskShare, UserTaskStats
+from ..stats import find_drift
+
+class TaskStatsTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.work = Category.objects.create(name='Work', user=self.user)
+        self.home = Category.objects.create(name='Home', user=self.user)
+
+    def _stats(self, client=None):
+        response = (client or self.client).get(reverse('task-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(find_drift(), {})
+        return response.data
+
+    def test_counts_follow_task_changes(self):
+        """Creates, edits and deletes adjust the counters without drift"""
+        past = timezone.now() - timezone.timedelta(days=1)
+        self.client.post(reverse('task-list'), {'title': 'A', 'priority': 'HIGH', 'category_id': self.work.id}, format='json')
+        self.client.post(reverse('task-list'), {'title': 'B', 'priority': 'LOW', 'due_date': past.isoformat()}, format='json')
+        task = Task.objects.create(title='C', user=self.user, category=self.home, completed=True)
+
+        stats = self._stats()
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['pending'], 2)
+        self.assertEqual(stats['overdue'], 1)
+        self.assertEqual(stats['by_priority'], {'LOW': 1, 'MEDIUM': 1, 'HIGH': 1, 'URGENT': 0})
+        self.assertEqual(stats['by_category'], [
+            {'category': None, 'name': None, 'count': 1},
+            {'category': self.work.id, 'name': 'Work', 'count': 1},
+            {'category': self.home.id, 'name': 'Home', 'count': 1},
+        ])
+
+        response = self.client.patch(
+            reverse('task-detail', kwargs={'pk': task.pk}),
+            {'completed': False, 'priority': 'URGENT', 'category_id': self.work.id},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = self._stats()
+        self.assertEqual(stats['completed'], 0)
+        self.assertEqual(stats['by_priority']['URGENT'], 1)
+        self.assertEqual(stats['by_priority']['MEDIUM'], 0)
+
+        task.delete()
+        self.assertEqual(self._stats()['total'], 2)
+
+    def test_shares_count_for_the_recipient(self):
+        task = Task.objects.create(title='Shared', user=self.user, priority='HIGH')
+        share = TaskShare.objects.create(task=task, shared_with=self.other_user)
+        other_client = APIClient()
+        other_client.force_authenticate(user=self.other_user)
+        self.assertEqual(self._stats(other_client)['by_priority']['HIGH'], 1)
+
+        task.priority = 'LOW'
+        task.save()
+        self.assertEqual(self._stats(other_client)['by_priority']['LOW'], 1)
+
+        share.delete()
+        self.assertEqual(self._stats(other_client)['total'], 0)
+        TaskShare.objects.create(task=task, shared_with=self.other_user)
+        task.delete()
+        self.assertEqual(self._stats(other_client)['total'], 0)
+
+    def test_deleted_category(self):
+        """A deleted category's tasks are counted as uncategorized"""
+        Task.objects.create(title='A', user=self.user, category=self.work)
+        Task.objects.create(title='B', user=self.user)
+        self.work.delete()
+        stats = self._stats()
+        self.assertEqual(stats['by_category'], [{'category': None, 'name': None, 'count': 2}])
+
+    def test_bulk_and_import_paths(self):
+        """Writes that bypass model signals keep the counters in step"""
+        response = self.client.post(reverse('task-bulk'), {'create': [
+            {'title': f'Bulk {i}', 'priority': 'HIGH'} for i in range(3)
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [task['id'] for task in response.data['created']]
+        self.client.post(reverse('task-bulk'), {
+            'update': [{'id': ids[0], 'completed': True, 'category_id': self.home.id}],
+            'delete': [ids[1]],
+        }, format='json')
+        upload = SimpleUploadedFile('tasks.ndjson', b'{"title": "Imported", "category": "Work"}\n')
+        self.client.post(reverse('task-import'), {'file': upload}, format='multipart')
+
+        stats = self._stats()
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['by_priority']['HIGH'], 2)
+
+    def test_queryset_and_cascade_deletes(self):
+        """Queryset deletes, reused querysets and user cascades uncount every task once"""
+        for i in range(3):
+            task = Task.objects.create(title=f'Mine {i}', user=self.user, category=self.work)
+            TaskShare.objects.create(task=task, shared_with=self.other_user)
+        tasks = Task.objects.filter(user=self.user, category=self.work)
+        tasks.delete()
+        self.assertEqual(self._stats()['total'], 0)
+
+        Task.objects.create(title='Later', user=self.user, category=self.work)
+        tasks.delete()
+        self.assertEqual(self._stats()['total'], 0)
+
+        theirs = Task.objects.create(title='Theirs', user=self.other_user)
+        TaskShare.objects.create(task=theirs, shared_with=self.user)
+        self.other_user.delete()
+        self.assertEqual(self._stats()['total'], 0)
+
+    def test_rebuild_command(self):
+        """The command reports drift and rebuilds the counters"""
+        Task.objects.create(title='A', user=self.user)
+        UserTaskStats.objects.filter(user=self.user).update(count=5)
+
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_task_stats', '--check', stdout=out)
+        self.assertIn('stored 5, actual 1', out.getvalue())
+
+        call_command('rebuild_task_stats', '--user', 'testuser', stdout=StringIO())
+        self.assertEqual(self._stats()['total'], 1)
+        out = StringIO()
+        call_command('rebuild_task_stats', '--check', stdout=out)
+        self.assertIn('consistent', out.getvalue())
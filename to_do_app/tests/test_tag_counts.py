@@ -0,0 +1,90 @@
+from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..cache import get_cache
+from ..models import Task, Tag
+
+class TagTaskCountTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tags = [Tag.objects.create(name=f'Tag {i}', user=self.user) for i in range(3)]
+        self.tasks = [Task.objects.create(title=f'Task {i}', user=self.user) for i in range(3)]
+
+    def assertCountsMatch(self):
+        """Every stored count equals the number of tasks using the tag"""
+        for tag in Tag.objects.all():
+            self.assertEqual(tag.task_count, tag.tasks.count(), tag.name)
+
+    def _counts(self):
+        return dict(Tag.objects.values_list('name', 'task_count'))
+
+    def test_m2m_changes_from_both_sides(self):
+        """add, remove, set and clear keep the counts in step"""
+        task, other, _ = self.tasks
+        task.tags.add(*self.tags)
+        task.tags.add(self.tags[0])
+        self.tags[0].tasks.add(other, *self.tasks)
+        self.assertEqual(self._counts(), {'Tag 0': 3, 'Tag 1': 1, 'Tag 2': 1})
+
+        task.tags.remove(self.tags[1], self.tags[1])
+        self.tags[0].tasks.remove(other)
+        other.tags.remove(self.tags[2])
+        task.tags.set([self.tags[2]])
+        self.assertEqual(self._counts(), {'Tag 0': 1, 'Tag 1': 0, 'Tag 2': 1})
+        self.assertCountsMatch()
+
+        self.tags[0].tasks.clear()
+        task.tags.clear()
+        self.assertEqual(self._counts(), {'Tag 0': 0, 'Tag 1': 0, 'Tag 2': 0})
+
+    def test_task_delete(self):
+        """Deleting tasks uncounts them from their tags"""
+        for task in self.tasks:
+            task.tags.add(*self.tags[:2])
+        self.tasks[0].delete()
+        Task.objects.filter(pk=self.tasks[1].pk).delete()
+        self.assertEqual(self._counts(), {'Tag 0': 1, 'Tag 1': 1, 'Tag 2': 0})
+
+    def test_bulk_batch_and_import_paths(self):
+        """Writes to the through table that skip m2m_changed keep the counts in step"""
+        response = self.client.post(reverse('task-bulk'), {
+            'create': [{'title': 'Bulk', 'tag_ids': [self.tags[0].id], 'tag_names': ['Fresh']}],
+            'update': [{'id': self.tasks[0].id, 'tag_ids': [self.tags[1].id]}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.post(reverse('task-bulk'), {
+            'update': [{'id': self.tasks[0].id, 'tag_ids': [self.tags[2].id]}],
+        }, format='json')
+
+        batch = reverse('task-batch-tags')
+        self.client.post(batch, {'task_ids': [task.id for task in self.tasks], 'add': {'tag_names': ['Tag 0']}}, format='json')
+        self.client.post(batch, {'task_ids': [self.tasks[1].id], 'remove': {'tag_ids': [self.tags[0].id]}}, format='json')
+        self.client.post(batch, {'task_ids': [self.tasks[2].id], 'replace': {'tag_names': ['Fresh']}}, format='json')
+
+        upload = SimpleUploadedFile('tasks.ndjson', b'{"title": "Imported", "tags": ["Tag 1", "Fresh"]}\n')
+        self.client.post(reverse('task-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(self._counts(), {'Tag 0': 2, 'Tag 1': 1, 'Tag 2': 1, 'Fresh': 3})
+        self.assertCountsMatch()
+
+    def test_popular(self):
+        """Popular tags come back by stored count, then name"""
+        self.tasks[0].tags.add(*self.tags)
+        self.tasks[1].tags.add(self.tags[2], self.tags[1])
+        self.tasks[2].tags.add(self.tags[2])
+        response = self.client.get(reverse('tag-popular'))
+        self.assertEqual(
+            [(tag['name'], tag['task_count']) for tag in response.data],
+            [('Tag 2', 3), ('Tag 1', 2), ('Tag 0', 1)]
+        )
@@ -1,4 +1,5 @@
 from django.test import TestCase
+from django.db import IntegrityError, transaction
 from django.urls import reverse, resolve
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -163,18 +164,23 @@ class BackgroundTaskTestCase(TestCase):
 
     def test_notification_deduplication(self):
         """Test notification deduplication"""
-        # Create multiple notifications for the same task with different scheduled times
-        notifications = []
+        # A task can only hold one pending notification, so duplicates are
+        # rejected when written instead of being sorted out by the sender
         base_time = timezone.now() - timezone.timedelta(minutes=1)
-        
-        for i in range(3):
-            notification = TaskNotification.objects.create(
-                task=self.due_soon_task,
-                user=self.user,
-                scheduled_time=base_time + timezone.timedelta(minutes=i),
-                status='PENDING'
-            )
-            notifications.append(notification)
+        TaskNotification.objects.create(
+            task=self.due_soon_task,
+            user=self.user,
+            scheduled_time=base_time,
+            status='PENDING'
+        )
+        for i in range(1, 3):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                TaskNotification.objects.create(
+                    task=self.due_soon_task,
+                    user=self.user,
+                    scheduled_time=base_time + timezone.timedelta(minutes=i),
+                    status='PENDING'
+                )
         
         # Run the notification sender with email backend for testing
         from django.core import mail
@@ -187,18 +193,13 @@ class BackgroundTaskTestCase(TestCase):
             # Verify email was sent
             self.assertEqual(len(mail.outbox), 1)
             
-            # Verify only one notification was sent and others were marked as duplicates
+            # Verify the one notification was sent
             sent_count = TaskNotification.objects.filter(
                 task=self.due_soon_task,
                 status='SENT'
             ).count()
             self.assertEqual(sent_count, 1)
-            
-            duplicate_count = TaskNotification.objects.filter(
-                task=self.due_soon_task,
-                status='DUPLICATE'
-            ).count()
-            self.assertEqual(duplicate_count, 2)
+            self.assertFalse(TaskNotification.objects.filter(status='PENDING', task=self.due_soon_task).exists())
             
             # Verify email content
             email = mail.outbox[0]
@@ -0,0 +1,74 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from ..cache import get_cache
+from ..models import Task, Category, Tag, TaskShare, TaskNotification
+from ..serializers import TaskSerializer
+from ..values_serializers import TaskValuesSerializer
+
+class TaskValuesSerializerTestCase(TestCase):
+    def setUp(self):
+        """Set up test data covering every nested relation and null value"""
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name='Work', description='Office work', user=self.user)
+        tags = [Tag.objects.create(name=name, user=self.user, color='#00FF00') for name in ['b', 'a', 'c']]
+        for i in range(6):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                description='Details' if i % 2 else '',
+                user=self.user,
+                category=category if i % 3 else None,
+                priority=['LOW', 'MEDIUM', 'HIGH', 'URGENT'][i % 4],
+                completed=bool(i % 2),
+                due_date=timezone.now() + timezone.timedelta(days=i) if i % 2 else None
+            )
+            task.tags.add(*tags[:i % 4])
+            if i % 2:
+                TaskShare.objects.create(task=task, shared_with=self.other_user, permission='EDIT')
+                TaskNotification.objects.create(
+                    task=task, user=self.user, scheduled_time=timezone.now(),
+                    status='SENT', sent_at=timezone.now()
+                )
+                TaskNotification.objects.create(
+                    task=task, user=self.user, scheduled_time=timezone.now() + timezone.timedelta(hours=1)
+                )
+        shared = Task.objects.create(title='Shared with me', user=self.other_user)
+        TaskShare.objects.create(task=shared, shared_with=self.user)
+
+    def test_matches_task_serializer(self):
+        """Every task renders exactly as TaskSerializer renders it"""
+        tasks = Task.objects.visible_to(self.user).order_by('id')
+        expected = TaskSerializer(TaskSerializer.setup_eager_loading(tasks), many=True).data
+        actual = TaskValuesSerializer(TaskValuesSerializer.values(tasks)).data
+        self.assertEqual(len(actual), 7)
+        self.assertEqual(actual, [dict(task) for task in expected])
+
+    def test_list_endpoints_use_values(self):
+        """List responses are unchanged and still page by cursor"""
+        url = reverse('task-list')
+        response = self.client.get(url, {'page_size': 4, 'ordering': 'due_date'})
+        tasks = Task.objects.visible_to(self.user).filter(pk__in=[task['id'] for task in response.data['results']])
+        expected = {task['id']: dict(task) for task in TaskSerializer(TaskSerializer.setup_eager_loading(tasks), many=True).data}
+        self.assertEqual(response.data['results'], [expected[task['id']] for task in response.data['results']])
+
+        next_page = self.client.get(response.data['next'])
+        self.assertEqual(len(next_page.data['results']), 3)
+        ids = [task['id'] for task in response.data['results'] + next_page.data['results']]
+        self.assertEqual(sorted(ids), sorted(Task.objects.visible_to(self.user).values_list('id', flat=True)))
+
+        response = self.client.get(reverse('task-pending-tasks'))
+        self.assertEqual({task['title'] for task in response.data['results']}, {'Task 0', 'Task 2', 'Task 4', 'Shared with me'})
@@ -190,19 +190,44 @@ class ViewTestCase(TestCase):
         # Filter by category
         response = self.client.get(url, {'category': self.category.id})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
         # Filter by priority
         response = self.client.get(url, {'priority': 'HIGH'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
         # Search by title
         response = self.client.get(url, {'search': 'Test Task'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
         # Filter by tag
         response = self.client.get(url, {'tags': self.tag.id})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1) 
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_shared_task_permissions(self):
+        """Edit and delete rights come from the share permission"""
+        task = Task.objects.create(title='Shared Task', user=self.user)
+        share = TaskShare.objects.create(task=task, shared_with=self.other_user, permission='EDIT')
+        self.client.force_authenticate(user=self.other_user)
+        url = reverse('task-detail', kwargs={'pk': task.id})
+
+        # Listing is a single join on the visibility table, without DISTINCT
+        from django.test.utils import CaptureQueriesContext
+        from django.db import connection
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task-list'))
+        self.assertEqual([t['id'] for t in response.data['results']], [task.id])
+        self.assertNotIn('DISTINCT', queries[0]['sql'])
+
+        response = self.client.patch(url, {'title': 'Edited'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        share.permission = 'DELETE'
+        share.save()
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
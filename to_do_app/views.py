@@ -1,16 +1,24 @@
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.utils import timezone
-from django.core.mail import send_mail
-from django.conf import settings
 from django.db.models import Count, Q
-from django.db import models
 from .models import Task, Category, TaskShare, NotificationPreference, TaskNotification, Tag
+from .pagination import TaskCursorPagination
+from .exports import CSVRenderer, NDJSONRenderer, csv_lines, ndjson_lines
+from .imports import READERS, ImportFormatError, TaskImporter
+from .values_serializers import TaskValuesSerializer
+from .stats import get_task_stats
+from .cache import CachedListMixin, user_etag, user_last_modified
+from .notifications import reschedule_for_preference, send_task_notifications
 from .serializers import (
     TaskSerializer, 
     UserSerializer, 
@@ -20,10 +28,30 @@ from .serializers import (
     TaskShareSerializer,
     NotificationPreferenceSerializer,
     TaskNotificationSerializer,
-    TagSerializer
+    TagSerializer,
+    TaskBulkSerializer,
+    TaskTagBatchSerializer
 )
 from rest_framework import serializers
 
+# Conditional GET: answer If-None-Match/If-Modified-Since with a 304 from the
+# user's cache generation, one primary key lookup, before any other query or
+# serialization work is done
+user_conditional = method_decorator(
+    condition(etag_func=user_etag, last_modified_func=user_last_modified)
+)
+
+def upcoming_notifications_queryset(user):
+    return TaskNotification.objects.filter(
+        user=user,
+        status='PENDING',
+        scheduled_time__gte=timezone.now()
+    )
+
+def upcoming_notifications_etag(request, *args, **kwargs):
+    """The upcoming set also shrinks as time passes, so its size is part of the ETag"""
+    return user_etag(request, extra=upcoming_notifications_queryset(request.user).count())
+
 class UserViewSet(viewsets.ModelViewSet):
     queryset = get_user_model().objects.all()
     serializer_class = UserSerializer
@@ -62,7 +90,7 @@ class UserViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedListMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter]
@@ -86,24 +114,35 @@ class NotificationPreferenceViewSet(viewsets.ModelViewSet):
         pref, created = NotificationPreference.objects.get_or_create(user=self.request.user)
         return pref
 
-class TagViewSet(viewsets.ModelViewSet):
+    def perform_create(self, serializer):
+        reschedule_for_preference(serializer.save())
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        before = (instance.email_notifications, instance.notification_timing)
+        pref = serializer.save()
+        # Pending reminders only depend on these two fields
+        if (pref.email_notifications, pref.notification_timing) != before:
+            reschedule_for_preference(pref)
+
+class TagViewSet(CachedListMixin, viewsets.ModelViewSet):
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
 
     def get_queryset(self):
-        return Tag.objects.filter(user=self.request.user).annotate(
-            task_count=Count('tasks')
-        )
+        return Tag.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     @action(detail=False, methods=['get'])
+    @user_conditional
     def popular(self, request):
         """Get most used tags"""
-        tags = self.get_queryset().order_by('-task_count')[:10]
+        # Read in tag_user_task_count_idx order, without counting any tasks
+        tags = self.get_queryset().order_by('-task_count', 'name')[:10]
         serializer = self.get_serializer(tags, many=True)
         return Response(serializer.data)
 
@@ -111,11 +150,18 @@ class TagViewSet(viewsets.ModelViewSet):
     def tasks(self, request, pk=None):
         """Get all tasks for a specific tag"""
         tag = self.get_object()
-        tasks = tag.tasks.filter(user=request.user)
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
-
-class TaskViewSet(viewsets.ModelViewSet):
+        tasks = TaskSerializer.setup_eager_loading(tag.tasks.filter(user=request.user))
+        paginator = TaskCursorPagination()
+        page = paginator.paginate_queryset(tasks, request, view=self)
+        serializer = TaskSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+class TaskListMixin:
+    """Send ListModelMixin.list through paginated_response like the list-style actions"""
+    def list(self, request, *args, **kwargs):
+        return self.paginated_response(self.filter_queryset(self.get_queryset()))
+
+class TaskViewSet(CachedListMixin, TaskListMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -123,13 +169,25 @@ class TaskViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'description', 'tags__name']
     ordering_fields = ['created_at', 'updated_at', 'due_date', 'priority']
     ordering = ['-created_at']
+    pagination_class = TaskCursorPagination
+    # List actions rendered by TaskValuesSerializer instead of TaskSerializer,
+    # unless the request asks for a sparse fieldset
+    values_actions = ['list', 'completed_tasks', 'pending_tasks', 'tasks_by_category', 'tasks_by_priority', 'by_tag']
 
     def get_queryset(self):
-        user = self.request.user
-        return Task.objects.filter(
-            models.Q(user=user) | 
-            models.Q(shares__shared_with=user)
-        ).distinct()
+        # ?fields= and ?expand= trim both the queryset and the serializer
+        return TaskSerializer.setup_eager_loading(
+            Task.objects.visible_to(self.request.user),
+            TaskSerializer.sparse_fieldset(self.request)
+        )
+
+    @user_conditional
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @user_conditional
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def get_permissions(self):
         if self.action in ['create', 'list', 'retrieve']:
@@ -140,19 +198,12 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
     def perform_update(self, serializer):
-        task = self.get_object()
-        if task.user != self.request.user and not task.shares.filter(
-            shared_with=self.request.user,
-            permission__in=['EDIT', 'DELETE']
-        ).exists():
+        if serializer.instance.permission not in ['OWNER', 'EDIT', 'DELETE']:
             raise PermissionDenied("You don't have permission to edit this task")
         serializer.save()
 
     def perform_destroy(self, instance):
-        if instance.user != self.request.user and not instance.shares.filter(
-            shared_with=self.request.user,
-            permission='DELETE'
-        ).exists():
+        if instance.permission not in ['OWNER', 'DELETE']:
             raise PermissionDenied("You don't have permission to delete this task")
         instance.delete()
 
@@ -196,17 +247,82 @@ class TaskViewSet(viewsets.ModelViewSet):
                 'filter': f"Filter error: {str(e)}"
             })
 
+    def paginated_response(self, queryset):
+        """Serialize one cursor page of tasks for the list-style actions"""
+        if self.action in self.values_actions and TaskSerializer.sparse_fieldset(self.request) is None:
+            page = self.paginate_queryset(TaskValuesSerializer.values(queryset))
+            return self.get_paginated_response(TaskValuesSerializer(page).data)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Stream every task matching the list filters as NDJSON (the default)
+        or CSV, chosen with ?format=ndjson|csv or the Accept header.
+        """
+        # Exports always carry every field, so ?fields= does not apply.
+        # Validate the filters before the response starts streaming.
+        tasks = self.filter_queryset(TaskSerializer.setup_eager_loading(
+            Task.objects.visible_to(request.user)
+        ))
+        if request.accepted_renderer.format == 'csv':
+            response = StreamingHttpResponse(csv_lines(tasks), content_type='text/csv')
+            filename = 'tasks.csv'
+        else:
+            response = StreamingHttpResponse(ndjson_lines(tasks), content_type='application/x-ndjson')
+            filename = 'tasks.ndjson'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import',
+            parser_classes=[MultiPartParser, FormParser])
+    def import_tasks(self, request):
+        """
+        Create tasks from an uploaded NDJSON or CSV file, such as an export.
+
+        The format is taken from the format field or else the file
+        extension. Valid rows are imported even when others fail; the
+        response counts both and lists the errors by line.
+        """
+        upload = request.data.get('file')
+        if not upload or isinstance(upload, str):
+            return Response(
+                {"error": "file is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        format = request.data.get('format') or ('csv' if upload.name.lower().endswith('.csv') else 'ndjson')
+        if format not in READERS:
+            return Response(
+                {"error": f"Invalid format. Choices are: {', '.join(READERS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        importer = TaskImporter(request.user)
+        try:
+            report = importer.run(upload, format)
+        except ImportFormatError as e:
+            return Response(
+                {"error": f"Could not read the file: {e}", **importer.report},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(report)
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Task counts by completion, priority and category, plus overdue tasks"""
+        return Response(get_task_stats(request.user))
+
     @action(detail=False, methods=['get'])
-    def completed_tasks(self):
+    def completed_tasks(self, request):
         tasks = self.get_queryset().filter(completed=True)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(tasks)
 
     @action(detail=False, methods=['get'])
-    def pending_tasks(self):
+    def pending_tasks(self, request):
         tasks = self.get_queryset().filter(completed=False)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(tasks)
 
     @action(detail=False, methods=['get'])
     def tasks_by_category(self, request):
@@ -218,8 +334,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         tasks = self.get_queryset().filter(category_id=category_id)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(tasks)
 
     @action(detail=False, methods=['get'])
     def tasks_by_priority(self, request):
@@ -237,8 +352,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         tasks = self.get_queryset().filter(priority=priority)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(tasks)
 
     @action(detail=False, methods=['get'])
     def by_tag(self, request):
@@ -248,6 +362,10 @@ class TaskViewSet(viewsets.ModelViewSet):
         
         queryset = self.get_queryset()
         
+        # Matching several tags joins a task once per tag
+        if tag_ids or tag_names:
+            queryset = queryset.distinct()
+        
         if tag_ids:
             queryset = queryset.filter(tags__id__in=tag_ids)
         
@@ -271,8 +389,44 @@ class TaskViewSet(viewsets.ModelViewSet):
                     matching_tags=Count('tags', distinct=True)
                 ).filter(matching_tags=len(tag_names))
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(queryset)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create, partially update and delete many tasks in one transaction"""
+        serializer = TaskBulkSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+
+        written = result['created'] + result['updated']
+        tasks = self.get_queryset().in_bulk([task.pk for task in written])
+        return Response({
+            'created': self.get_serializer([tasks[task.pk] for task in result['created']], many=True).data,
+            'updated': self.get_serializer([tasks[task.pk] for task in result['updated']], many=True).data,
+            'deleted': result['deleted'],
+        })
+
+    @action(detail=False, methods=['post'])
+    def batch_tags(self, request):
+        """
+        Add, remove or replace tags on many of the user's own tasks at once.
+
+        The tasks are either listed in task_ids or selected with the same
+        query string filters as the task list.
+        """
+        serializer = TaskTagBatchSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        if 'task_ids' in serializer.validated_data:
+            return Response(serializer.save())
+
+        if not request.query_params:
+            return Response(
+                {"error": "task_ids or a filter is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # The serializer limits the filtered tasks to the user's own
+        tasks = self.filter_queryset(Task.objects.all())
+        return Response(serializer.save(tasks=tasks))
 
     @action(detail=True, methods=['post'])
     def add_tags(self, request, pk=None):
@@ -288,27 +442,25 @@ class TaskViewSet(viewsets.ModelViewSet):
         tag_ids = request.data.get('tag_ids', [])
         tag_names = request.data.get('tag_names', [])
         
+        tags = set()
         # Validate tag_ids
         if tag_ids:
-            tags = Tag.objects.filter(id__in=tag_ids, user=request.user)
-            if len(tags) != len(tag_ids):
+            tags.update(Tag.objects.filter(id__in=tag_ids, user=request.user).values_list('id', flat=True))
+            if len(tags) != len(set(tag_ids)):
                 return Response(
                     {"error": "One or more tags do not exist or do not belong to you"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            task.tags.add(*tags)
-        
-        # Handle tag_names
+
+        # Handle tag_names, creating the missing ones in a single insert
         if tag_names:
-            for name in tag_names:
-                tag, created = Tag.objects.get_or_create(
-                    name=name,
-                    user=request.user,
-                    defaults={'color': '#FF0000'}
-                )
-                task.tags.add(tag)
-        
-        serializer = self.get_serializer(task)
+            tags.update(tag.id for tag in Tag.objects.resolve_names(request.user.id, tag_names).values())
+
+        if tags:
+            task.tags.add(*tags)
+
+        # Reload through the eager-loading queryset, which the add() cleared
+        serializer = self.get_serializer(self.get_queryset().get(pk=task.pk))
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
@@ -325,13 +477,17 @@ class TaskViewSet(viewsets.ModelViewSet):
         tag_ids = request.data.get('tag_ids', [])
         tag_names = request.data.get('tag_names', [])
         
-        if tag_ids:
-            task.tags.remove(*tag_ids)
-        
+        tags = set(tag_ids)
         if tag_names:
-            task.tags.remove(*Tag.objects.filter(name__in=tag_names, user=request.user))
+            tags.update(
+                Tag.objects.filter(name__in=tag_names, user=request.user).values_list('id', flat=True)
+            )
+
+        # One DELETE on the through table for ids and names together
+        if tags:
+            task.tags.remove(*tags)
         
-        serializer = self.get_serializer(task)
+        serializer = self.get_serializer(self.get_queryset().get(pk=task.pk))
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
@@ -404,102 +560,10 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=upcoming_notifications_etag))
     def upcoming_notifications(self, request):
         """Get all pending notifications for the current user"""
-        notifications = TaskNotification.objects.filter(
-            user=request.user,
-            status='PENDING',
-            scheduled_time__gte=timezone.now()
-        ).select_related('task')
+        notifications = upcoming_notifications_queryset(request.user).select_related('task')
         
         serializer = TaskNotificationSerializer(notifications, many=True)
         return Response(serializer.data)
-
-def send_task_notifications():
-    """Send notifications for tasks that are due soon"""
-    now = timezone.now()
-    
-    # Get all pending notifications that are due to be sent
-    pending_notifications = TaskNotification.objects.filter(
-        status='PENDING',
-        scheduled_time__lte=now
-    ).select_related('task', 'user').order_by('scheduled_time')
-    
-    # Group notifications by task to handle deduplication
-    task_notifications = {}
-    for notification in pending_notifications:
-        if notification.task_id not in task_notifications:
-            task_notifications[notification.task_id] = []
-        task_notifications[notification.task_id].append(notification)
-    
-    # Process notifications for each task
-    for task_id, notifications in task_notifications.items():
-        # Keep only the earliest notification for each task
-        primary_notification = notifications[0]
-        duplicate_notifications = notifications[1:]
-        
-        try:
-            # Attempt to send the notification
-            if not primary_notification.user.email:
-                raise ValueError("User has no email address")
-            
-            task = primary_notification.task
-            subject = f'Task Due Soon: {task.title}'
-            message = (
-                f'Your task "{task.title}" is due {task.due_date.strftime("%Y-%m-%d %H:%M")}.\n\n'
-                f'Description: {task.description or "No description"}\n'
-                f'Priority: {task.priority}\n'
-                f'Status: {"Completed" if task.completed else "Pending"}'
-            )
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [primary_notification.user.email],
-                fail_silently=False,
-            )
-            
-            # Mark the notification as sent
-            primary_notification.status = 'SENT'
-            primary_notification.sent_at = timezone.now()
-            primary_notification.save()
-            
-            # Mark other notifications as duplicates
-            if duplicate_notifications:
-                # First, mark all notifications as duplicates
-                TaskNotification.objects.filter(
-                    id__in=[n.id for n in duplicate_notifications]
-                ).update(
-                    status='DUPLICATE',
-                    error_message='Duplicate notification - another notification was sent for this task'
-                )
-                
-                # Then, mark any notifications with the same scheduled time as the primary as duplicates
-                TaskNotification.objects.filter(
-                    task=task,
-                    user=primary_notification.user,
-                    scheduled_time=primary_notification.scheduled_time,
-                    status='PENDING'
-                ).exclude(
-                    id=primary_notification.id
-                ).update(
-                    status='DUPLICATE',
-                    error_message='Duplicate notification - another notification was sent for this task'
-                )
-                
-        except Exception as e:
-            # Handle any errors that occur during sending
-            error_message = str(e)
-            primary_notification.status = 'FAILED'
-            primary_notification.error_message = error_message
-            primary_notification.save()
-            
-            # Mark duplicates as failed as well
-            if duplicate_notifications:
-                TaskNotification.objects.filter(
-                    id__in=[n.id for n in duplicate_notifications]
-                ).update(
-                    status='FAILED',
-                    error_message=error_message
-                )